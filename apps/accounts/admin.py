@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User, Address
 
@@ -8,6 +9,13 @@ class AddressInline(admin.TabularInline):
     extra = 0
 
 
+class UserChangeList(ChangeList):
+    def get_queryset(self, request):
+        # Only load the listed columns; the change form still gets full rows
+        queryset = super().get_queryset(request)
+        return queryset.only("id", *self.model_admin.list_display)
+
+
 class UserAdmin(BaseUserAdmin):
     list_display = (
         "email",
@@ -18,6 +26,8 @@ class UserAdmin(BaseUserAdmin):
         "date_joined",
     )
     list_filter = ("is_staff", "is_active")
+    list_per_page = 50
+    show_full_result_count = False
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         ("Personal info", {"fields": ("first_name", "last_name", "phone_number")}),
@@ -53,13 +63,29 @@ class UserAdmin(BaseUserAdmin):
             },
         ),
     )
-    search_fields = ("email", "first_name", "last_name")
+    search_fields = ("email",)
     ordering = ("email",)
     inlines = [AddressInline]
 
+    def get_changelist(self, request, **kwargs):
+        return UserChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        # Terms shorter than a trigram can't use the email trigram index,
+        # so match them as a prefix instead
+        if len(search_term) < 3:
+            return queryset.filter(email__istartswith=search_term), False
+        return queryset.filter(email__icontains=search_term), False
+
 
 class AddressAdmin(admin.ModelAdmin):
     list_display = ("user", "address_type", "city", "country", "is_default")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     list_filter = ("address_type", "is_default", "country")
     search_fields = ("user__email", "street_address", "city", "country")
 
@@ -0,0 +1,77 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class VerifiedTokenCache:
+    """
+    In-process LRU cache of tokens whose signature and claims were already
+    validated, so repeat requests with the same token skip the HMAC check
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.blake2b(raw_token, digest_size=16).digest()
+
+    def get(self, raw_token):
+        """Return the cached token or None if missing or expired"""
+        if not isinstance(raw_token, (str, bytes)) or not raw_token:
+            return None
+
+        key = self.make_key(raw_token)
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._tokens[key]
+                return None
+
+            self._tokens.move_to_end(key)
+            return token
+
+    def set(self, raw_token, token):
+        expires_at = token.get("exp")
+        if expires_at is None:
+            return
+
+        key = self.make_key(raw_token)
+        with self._lock:
+            self._tokens[key] = (token, expires_at)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reuses previously validated tokens until they
+    expire. The user lookup still runs on every request, so deactivated
+    users are rejected as before.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.set(raw_token, token)
+        return token
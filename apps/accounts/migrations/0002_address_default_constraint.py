@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='address',
+            options={'ordering': ['id'], 'verbose_name_plural': 'Addresses'},
+        ),
+        migrations.AlterUniqueTogether(
+            name='address',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='address',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user', 'address_type'), name='one_default_address_per_type'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_address_default_constraint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='address_type',
+            field=models.CharField(choices=[('billing', 'Billing'), ('shipping', 'Shipping')], db_index=True, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='address',
+            name='country',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_email_trigram_index(apps, schema_editor):
+    # icontains on PostgreSQL compiles to UPPER(email) LIKE UPPER(...),
+    # so the trigram index is built on the same expression
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS accounts_user_email_trgm_idx "
+        "ON accounts_user USING gin (UPPER(email) gin_trgm_ops)"
+    )
+
+
+def drop_email_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS accounts_user_email_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_address_type_country_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_email_trigram_index, drop_email_trigram_index),
+    ]
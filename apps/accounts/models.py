@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
@@ -46,25 +47,67 @@ class Address(models.Model):
     )
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="addresses")
-    address_type = models.CharField(max_length=10, choices=ADDRESS_TYPE_CHOICES)
+    address_type = models.CharField(
+        max_length=10, choices=ADDRESS_TYPE_CHOICES, db_index=True
+    )
     street_address = models.CharField(max_length=255)
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
     postal_code = models.CharField(max_length=20)
-    country = models.CharField(max_length=100)
+    country = models.CharField(max_length=100, db_index=True)
     is_default = models.BooleanField(default=False)
 
     class Meta:
         verbose_name_plural = "Addresses"
-        unique_together = [["user", "address_type", "is_default"]]
         ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "address_type"],
+                condition=Q(is_default=True),
+                name="one_default_address_per_type",
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.address_type} - {self.street_address}"
 
     def save(self, *args, **kwargs):
-        if self.is_default:
+        update_fields = kwargs.get("update_fields")
+        if not self.is_default or (
+            update_fields is not None and "is_default" not in update_fields
+        ):
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
             Address.objects.filter(
-                user=self.user, address_type=self.address_type, is_default=True
-            ).update(is_default=False)
-        super().save(*args, **kwargs)
+                user_id=self.user_id, address_type=self.address_type, is_default=True
+            ).exclude(pk=self.pk).update(is_default=False)
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def set_defaults_bulk(cls, addresses, batch_size=500):
+        """
+        Make each address the default for its user and address type.
+        Previous defaults are cleared with a single UPDATE and the new ones
+        written with one bulk UPDATE; if several addresses share a user and
+        type, the last one wins.
+        """
+        defaults = {
+            (address.user_id, address.address_type): address for address in addresses
+        }
+        if not defaults:
+            return []
+
+        previous = Q()
+        for user_id, address_type in defaults:
+            previous |= Q(user_id=user_id, address_type=address_type)
+
+        addresses = list(defaults.values())
+        for address in addresses:
+            address.is_default = True
+
+        with transaction.atomic():
+            cls.objects.filter(previous, is_default=True).update(is_default=False)
+            cls.objects.bulk_update(addresses, ["is_default"], batch_size=batch_size)
+        return addresses
@@ -27,12 +27,16 @@ class UserViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
+        # Load just the columns UserSerializer renders (never the password hash)
+        queryset = User.objects.only(*UserSerializer.Meta.fields)
         if self.request.user.is_staff:
-            return User.objects.all()
-        return User.objects.filter(id=self.request.user.id)
+            return queryset
+        return queryset.filter(pk=self.request.user.pk)
 
     @action(detail=False, methods=["get"])
     def me(self, request):
+        # The authenticated user is already loaded, so serialize it without
+        # touching the queryset
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
@@ -51,7 +55,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
             # Set new password
             user.set_password(serializer.validated_data["new_password"])
-            user.save()
+            user.save(update_fields=["password"])
             return Response(
                 {"message": "Password updated successfully"}, status=status.HTTP_200_OK
             )
@@ -64,7 +68,7 @@ class AddressViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Address.objects.filter(user=self.request.user)
+        return Address.objects.filter(user=self.request.user).select_related("user")
 
     @action(detail=False, methods=["get"])
     def shipping(self, request):
@@ -78,9 +82,23 @@ class AddressViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(billing_addresses, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def by_type(self, request):
+        # One query for every address, grouped by type for the checkout page
+        grouped = {address_type: [] for address_type, _ in Address.ADDRESS_TYPE_CHOICES}
+        for address in self.get_queryset():
+            grouped[address.address_type].append(address)
+
+        return Response(
+            {
+                address_type: self.get_serializer(addresses, many=True).data
+                for address_type, addresses in grouped.items()
+            }
+        )
+
     @action(detail=True, methods=["post"])
     def set_default(self, request, pk=None):
         address = self.get_object()
         address.is_default = True
-        address.save()
+        address.save(update_fields=["is_default"])
         return Response({"message": f"Address set as default {address.address_type}"})
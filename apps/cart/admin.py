@@ -11,6 +11,7 @@ class CartItemInline(admin.TabularInline):
 class CartAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "total_items", "subtotal", "created_at", "updated_at")
     search_fields = ("user__email",)
+    raw_id_fields = ("user",)
     inlines = [CartItemInline]
     readonly_fields = ("created_at", "updated_at")
 
@@ -27,6 +28,7 @@ class CartItemAdmin(admin.ModelAdmin):
     )
     list_filter = ("created_at",)
     search_fields = ("cart__user__email", "product__name")
+    raw_id_fields = ("cart", "product")
     readonly_fields = ("unit_price", "total_price", "created_at", "updated_at")
 
 
@@ -1,26 +1,145 @@
-from django.db import models
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import connections, models, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from apps.products.models import Product
 
 User = get_user_model()
 
 
+def final_price_expression(product_path):
+    """
+    Database expression for Product.final_price of the product at
+    product_path (a zero discount price falls back to price)
+    """
+    return Coalesce(
+        NullIf(f"{product_path}__discount_price", Value(Decimal("0"))),
+        f"{product_path}__price",
+    )
+
+
+class CartQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate each cart's item count and subtotal computed by the database"""
+        return self.annotate(
+            annotated_total_items=Coalesce(Sum("items__quantity"), 0),
+            annotated_subtotal=Coalesce(
+                Sum(
+                    final_price_expression("items__product") * F("items__quantity"),
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                ),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+        )
+
+
 class Cart(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="cart")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartQuerySet.as_manager()
+
     def __str__(self):
         return f"Cart for {self.user.email}"
 
     @property
     def total_items(self):
+        if hasattr(self, "annotated_total_items"):
+            return self.annotated_total_items
         return sum(item.quantity for item in self.items.all())
 
     @property
     def subtotal(self):
+        if hasattr(self, "annotated_subtotal"):
+            return self.annotated_subtotal
         return sum(item.total_price for item in self.items.all())
 
+    def add_items(self, items):
+        """
+        Add several (product_id, quantity) pairs to the cart at once.
+        Stock is checked for all products with one query and the items are
+        written with a single upsert. Raises ValidationError if any product
+        is unavailable or would exceed its stock; nothing is saved then.
+        """
+        quantities = {}
+        for product_id, quantity in items:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        with transaction.atomic():
+            # Lock the product rows so concurrent adds see a stable stock
+            stock = dict(
+                Product.objects.select_for_update()
+                .filter(id__in=quantities, is_active=True)
+                .values_list("id", "stock")
+            )
+            in_cart = dict(
+                self.items.filter(product_id__in=quantities).values_list(
+                    "product_id", "quantity"
+                )
+            )
+
+            cart_items = []
+            for product_id, quantity in quantities.items():
+                if product_id not in stock:
+                    raise ValidationError(f"Product {product_id} is not available.")
+
+                total = in_cart.get(product_id, 0) + quantity
+                if total > stock[product_id]:
+                    raise ValidationError(
+                        f"Only {stock[product_id]} items of product {product_id} available."
+                    )
+                cart_items.append(
+                    CartItem(cart=self, product_id=product_id, quantity=total)
+                )
+
+            CartItem.objects.bulk_create(
+                cart_items,
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity", "updated_at"],
+            )
+
+
+class CartItemQuerySet(models.QuerySet):
+    def with_total_price(self):
+        """
+        Annotate each item's total price computed by the database, mirroring
+        Product.final_price (a zero discount price falls back to price)
+        """
+        return self.annotate(
+            annotated_total_price=ExpressionWrapper(
+                final_price_expression("product") * F("quantity"),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+        )
+
+    def add_quantity(self, cart_id, product_id, quantity):
+        """
+        Insert the item, or add to its quantity if it is already in the cart,
+        with a single upsert. Returns the resulting quantity.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(cart_id, product_id, quantity, created_at, updated_at) "
+                "VALUES (%s, %s, %s, %s, %s) "
+                "ON CONFLICT (cart_id, product_id) DO UPDATE SET "
+                f"quantity = {table}.quantity + EXCLUDED.quantity, "
+                "updated_at = EXCLUDED.updated_at "
+                "RETURNING quantity",
+                [cart_id, product_id, quantity, now, now],
+            )
+            return cursor.fetchone()[0]
+
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
@@ -29,8 +148,14 @@ class CartItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     class Meta:
-        unique_together = ["cart", "product"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product"], name="cart_cartitem_cart_product_uniq"
+            )
+        ]
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
@@ -41,4 +166,6 @@ class CartItem(models.Model):
 
     @property
     def total_price(self):
+        if hasattr(self, "annotated_total_price"):
+            return self.annotated_total_price
         return self.unit_price * self.quantity
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
+from apps.products.models import Product
 from apps.products.serializers import ProductSerializer
 
 
@@ -7,7 +8,7 @@ class CartItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         source="product",
-        queryset=ProductSerializer.Meta.model.objects.all(),
+        queryset=Product.objects.only("id", "is_active", "stock", "price"),
         write_only=True,
     )
     total_price = serializers.DecimalField(
@@ -47,44 +48,54 @@ class CartSerializer(serializers.ModelSerializer):
         read_only_fields = ["user", "created_at", "updated_at"]
 
 
-class AddToCartSerializer(serializers.Serializer):
+class AddToCartItemSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1, default=1)
 
+
+class AddToCartSerializer(AddToCartItemSerializer):
     def validate_product_id(self, value):
-        try:
-            product = ProductSerializer.Meta.model.objects.get(pk=value)
+        # Only the availability columns are needed, not the whole product row
+        row = Product.objects.filter(pk=value).values_list("is_active", "stock").first()
+        if row is None:
+            raise serializers.ValidationError({"detail": "Product not found."})
 
-            # Detailed product availability check
-            if not product.is_active:
-                raise serializers.ValidationError(
-                    {"detail": "This product is not available."}
-                )
+        is_active, stock = row
 
-            if product.stock <= 0:
-                raise serializers.ValidationError(
-                    {"detail": "This product is out of stock."}
-                )
+        # Detailed product availability check
+        if not is_active:
+            raise serializers.ValidationError(
+                {"detail": "This product is not available."}
+            )
 
-            return value
-        except ProductSerializer.Meta.model.DoesNotExist:
-            raise serializers.ValidationError({"detail": "Product not found."})
+        if stock <= 0:
+            raise serializers.ValidationError(
+                {"detail": "This product is out of stock."}
+            )
+
+        # Keep the stock so validate() and the view don't fetch it again
+        self._stock = stock
+        return value
 
     def validate(self, attrs):
-        product = ProductSerializer.Meta.model.objects.get(pk=attrs["product_id"])
+        stock = self._stock
         quantity = attrs["quantity"]
 
         # Validate quantity against available stock
-        if quantity > product.stock:
+        if quantity > stock:
             raise serializers.ValidationError(
                 {
-                    "detail": f"Requested quantity exceeds available stock. Only {product.stock} items available."
+                    "detail": f"Requested quantity exceeds available stock. Only {stock} items available."
                 }
             )
 
         return attrs
 
 
+class AddItemsToCartSerializer(serializers.Serializer):
+    items = AddToCartItemSerializer(many=True, allow_empty=False)
+
+
 class UpdateCartItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=1)
 
@@ -5,15 +5,24 @@ from rest_framework import status
 from .models import Cart, CartItem
 from apps.accounts.models import User, Address
 from apps.products.models import Category, Product
+from apps.core.cache import invalidate_user_cart
 import json
 
 
 class CartAPITestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Resolve the fixed endpoint URLs once for the whole class
+        cls.url_my_cart = reverse("cart-my-cart")
+        cls.url_add = reverse("cart-add-item")
+        cls.url_add_items = reverse("cart-add-items")
+        cls.url_clear = reverse("cart-clear")
+
+    @classmethod
+    def setUpTestData(cls):
         # Create test user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             email="user@example.com",
             password="user12345",
             first_name="Test",
@@ -21,7 +30,7 @@ class CartAPITestCase(TestCase):
         )
 
         # Create another test user for isolation testing
-        self.another_user = User.objects.create_user(
+        cls.another_user = User.objects.create_user(
             email="another@example.com",
             password="another12345",
             first_name="Another",
@@ -29,73 +38,84 @@ class CartAPITestCase(TestCase):
         )
 
         # Create category
-        self.category = Category.objects.create(
+        cls.category = Category.objects.create(
             name="Test Category", description="Test category description"
         )
 
         # Create products
-        self.product1 = Product.objects.create(
+        cls.product1 = Product.objects.create(
             name="Product 1",
             description="Product 1 description",
-            category=self.category,
+            category=cls.category,
             price=19.99,
             stock=10,
             is_active=True,
         )
 
-        self.product2 = Product.objects.create(
+        cls.product2 = Product.objects.create(
             name="Product 2",
             description="Product 2 description",
-            category=self.category,
+            category=cls.category,
             price=29.99,
             stock=5,
             is_active=True,
         )
 
-        self.out_of_stock_product = Product.objects.create(
+        cls.out_of_stock_product = Product.objects.create(
             name="Out of Stock Product",
             description="Out of stock product description",
-            category=self.category,
+            category=cls.category,
             price=39.99,
             stock=0,
             is_active=True,
         )
 
         # Create carts for each user
-        Cart.objects.create(user=self.user)
-        Cart.objects.create(user=self.another_user)
+        Cart.objects.create(user=cls.user)
+        Cart.objects.create(user=cls.another_user)
 
         # Cart data
-        self.cart_item_data = {"product_id": self.product1.id, "quantity": 2}
+        cls.cart_item_data = {"product_id": cls.product1.id, "quantity": 2}
+
+    def setUp(self):
+        self.client = APIClient()
+
+        # Fixture users are shared, so drop carts cached by earlier tests
+        invalidate_user_cart(self.user.id)
+        invalidate_user_cart(self.another_user.id)
 
     def authenticate_user(self, user="default"):
         """Helper method to authenticate users"""
-        if user == "another":
-            credentials = {"email": "another@example.com", "password": "another12345"}
-        else:
-            credentials = {"email": "user@example.com", "password": "user12345"}
-
-        response = self.client.post(
-            reverse("token_obtain_pair"), credentials, format="json"
+        self.client.force_authenticate(
+            user=self.another_user if user == "another" else self.user
         )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
 
     def test_get_empty_cart(self):
         """Test retrieving an empty cart"""
         self.authenticate_user()
 
-        url = reverse("cart-my-cart")
+        url = self.url_my_cart
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["total_items"], 0)
         self.assertEqual(len(response.data["items"]), 0)
 
+    def test_empty_cart_served_from_cache(self):
+        """Test that an empty cart is cached like any other cart"""
+        self.authenticate_user()
+        self.client.get(self.url_my_cart)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url_my_cart)
+
+        self.assertEqual(response.data["total_items"], 0)
+
     def test_add_item_to_cart(self):
         """Test adding an item to the cart"""
         self.authenticate_user()
 
-        url = reverse("cart-add-item")
+        url = self.url_add
         response = self.client.post(url, self.cart_item_data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -104,11 +124,30 @@ class CartAPITestCase(TestCase):
         self.assertEqual(response.data["items"][0]["product"]["id"], self.product1.id)
         self.assertEqual(response.data["items"][0]["quantity"], 2)
 
+    def test_my_cart_query_count(self):
+        """Test the cart is loaded with a fixed number of queries"""
+        self.authenticate_user()
+        cart = Cart.objects.get(user=self.user)
+        CartItem.objects.bulk_create(
+            [
+                CartItem(cart=cart, product=self.product1, quantity=1),
+                CartItem(cart=cart, product=self.product2, quantity=1),
+            ]
+        )
+        invalidate_user_cart(self.user.id)
+
+        # Cart, items with products, product images, product reviews
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url_my_cart)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["items"]), 2)
+
     def test_add_out_of_stock_item(self):
         """Test adding an out of stock item to cart"""
         self.authenticate_user()
 
-        url = reverse("cart-add-item")
+        url = self.url_add
         data = {"product_id": self.out_of_stock_product.id, "quantity": 1}
 
         response = self.client.post(url, data, format="json")
@@ -121,7 +160,7 @@ class CartAPITestCase(TestCase):
         """Test adding more items than available in stock"""
         self.authenticate_user()
 
-        url = reverse("cart-add-item")
+        url = self.url_add
         data = {"product_id": self.product2.id, "quantity": 10}  # Only 5 in stock
 
         response = self.client.post(url, data, format="json")
@@ -132,18 +171,71 @@ class CartAPITestCase(TestCase):
             "detail" in response.data or any("detail" in str(response.data.values()))
         )
 
+    def test_add_existing_item_beyond_stock(self):
+        """Test adding to an item already in the cart past the available stock"""
+        self.authenticate_user()
+
+        url = self.url_add
+        data = {"product_id": self.product2.id, "quantity": 4}  # Only 5 in stock
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(url, {**data, "quantity": 2}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("detail", response.data)
+
+        # The rejected add leaves the cart unchanged
+        cart_item = CartItem.objects.get(cart__user=self.user, product=self.product2)
+        self.assertEqual(cart_item.quantity, 4)
+
+    def test_add_multiple_items(self):
+        """Test adding several items to the cart in one request"""
+        self.authenticate_user()
+        self.client.post(self.url_add, self.cart_item_data, format="json")
+
+        data = {
+            "items": [
+                {"product_id": self.product1.id, "quantity": 3},
+                {"product_id": self.product2.id, "quantity": 2},
+            ]
+        }
+        response = self.client.post(self.url_add_items, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quantities = {
+            item["product"]["id"]: item["quantity"] for item in response.data["items"]
+        }
+        self.assertEqual(quantities, {self.product1.id: 5, self.product2.id: 2})
+
+    def test_add_multiple_items_beyond_stock(self):
+        """Test that a batch with one unavailable item adds nothing"""
+        self.authenticate_user()
+
+        data = {
+            "items": [
+                {"product_id": self.product1.id, "quantity": 1},
+                {"product_id": self.out_of_stock_product.id, "quantity": 1},
+            ]
+        }
+        response = self.client.post(self.url_add_items, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("detail", response.data)
+        self.assertFalse(CartItem.objects.filter(cart__user=self.user).exists())
+
     def test_update_cart_item_quantity(self):
         """Test updating the quantity of a cart item"""
         self.authenticate_user()
 
         # First add an item
         add_response = self.client.post(
-            reverse("cart-add-item"), self.cart_item_data, format="json"
+            self.url_add, self.cart_item_data, format="json"
         )
         self.assertEqual(add_response.status_code, status.HTTP_200_OK)
 
         # Get the cart to find the item ID
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertTrue(len(cart_response.data["items"]) > 0)
         item_id = cart_response.data["items"][0]["id"]
 
@@ -155,7 +247,7 @@ class CartAPITestCase(TestCase):
         self.assertEqual(response.data["quantity"], 3)
 
         # Verify in the cart
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(cart_response.data["total_items"], 3)
         self.assertEqual(cart_response.data["items"][0]["quantity"], 3)
 
@@ -165,12 +257,12 @@ class CartAPITestCase(TestCase):
 
         # First add an item
         add_response = self.client.post(
-            reverse("cart-add-item"), self.cart_item_data, format="json"
+            self.url_add, self.cart_item_data, format="json"
         )
         self.assertEqual(add_response.status_code, status.HTTP_200_OK)
 
         # Get the cart to find the item ID
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertTrue(len(cart_response.data["items"]) > 0)
         item_id = cart_response.data["items"][0]["id"]
 
@@ -181,7 +273,7 @@ class CartAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
         # Verify the cart is empty
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(cart_response.data["total_items"], 0)
         self.assertEqual(len(cart_response.data["items"]), 0)
 
@@ -191,29 +283,29 @@ class CartAPITestCase(TestCase):
 
         # Add multiple items
         add_response1 = self.client.post(
-            reverse("cart-add-item"), self.cart_item_data, format="json"
+            self.url_add, self.cart_item_data, format="json"
         )
         self.assertEqual(add_response1.status_code, status.HTTP_200_OK)
 
         add_response2 = self.client.post(
-            reverse("cart-add-item"),
+            self.url_add,
             {"product_id": self.product2.id, "quantity": 1},
             format="json",
         )
         self.assertEqual(add_response2.status_code, status.HTTP_200_OK)
 
         # Verify items were added
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(len(cart_response.data["items"]), 2)
 
-        # Clear the cart
-        url = reverse("cart-clear")
-        response = self.client.delete(url)
+        # Clear the cart with a single DELETE
+        with self.assertNumQueries(1):
+            response = self.client.delete(self.url_clear)
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
         # Verify the cart is empty
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(cart_response.data["total_items"], 0)
         self.assertEqual(len(cart_response.data["items"]), 0)
 
@@ -222,7 +314,7 @@ class CartAPITestCase(TestCase):
         # First user adds items
         self.authenticate_user()
         add_response = self.client.post(
-            reverse("cart-add-item"), self.cart_item_data, format="json"
+            self.url_add, self.cart_item_data, format="json"
         )
         self.assertEqual(add_response.status_code, status.HTTP_200_OK)
 
@@ -233,12 +325,12 @@ class CartAPITestCase(TestCase):
         self.authenticate_user("another")
 
         # Second user's cart should be empty
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(cart_response.data["total_items"], 0)
 
         # Second user adds different items
         add_response2 = self.client.post(
-            reverse("cart-add-item"),
+            self.url_add,
             {"product_id": self.product2.id, "quantity": 3},
             format="json",
         )
@@ -248,7 +340,7 @@ class CartAPITestCase(TestCase):
         self.authenticate_user()
 
         # First user's cart should still have original items
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         self.assertEqual(cart_response.data["total_items"], 2)
         self.assertEqual(
             cart_response.data["items"][0]["product"]["id"], self.product1.id
@@ -260,19 +352,19 @@ class CartAPITestCase(TestCase):
 
         # Add multiple items
         add_response1 = self.client.post(
-            reverse("cart-add-item"), self.cart_item_data, format="json"
+            self.url_add, self.cart_item_data, format="json"
         )  # 2 x $19.99
         self.assertEqual(add_response1.status_code, status.HTTP_200_OK)
 
         add_response2 = self.client.post(
-            reverse("cart-add-item"),
+            self.url_add,
             {"product_id": self.product2.id, "quantity": 1},
             format="json",
         )  # 1 x $29.99
         self.assertEqual(add_response2.status_code, status.HTTP_200_OK)
 
         # Expected subtotal: (2 * 19.99) + (1 * 29.99) = 69.97
-        cart_response = self.client.get(reverse("cart-my-cart"))
+        cart_response = self.client.get(self.url_my_cart)
         expected_subtotal = (2 * 19.99) + (1 * 29.99)
 
         # Use assertAlmostEqual for floating point comparison
@@ -1,41 +1,73 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from .models import Cart, CartItem
 from .serializers import (
     CartSerializer,
     CartItemSerializer,
     AddToCartSerializer,
+    AddItemsToCartSerializer,
     UpdateCartItemSerializer,
 )
 from apps.products.models import Product
 from apps.core.cache import cached_user_cart, cache_user_cart, invalidate_user_cart
 
 
+def cart_items_prefetch():
+    """Lookups needed to serialize a cart without per-item queries"""
+    return (
+        Prefetch(
+            "items",
+            queryset=CartItem.objects.select_related(
+                "product__category"
+            ).with_total_price(),
+        ),
+        "items__product__images",
+        "items__product__reviews",
+    )
+
+
 class CartViewSet(viewsets.GenericViewSet):
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return (
+            Cart.objects.filter(user=self.request.user)
+            .with_totals()
+            .select_related("user")
+            .prefetch_related(*cart_items_prefetch())
+        )
+
+    def get_or_create_cart(self, prefetch=False):
+        if prefetch:
+            # Existing carts come back with their items already loaded
+            cart = self.get_queryset().first()
+            if cart is not None:
+                return cart
 
-    def get_or_create_cart(self):
         cart, created = Cart.objects.get_or_create(user=self.request.user)
         return cart
 
+    def serialize_cart(self, cart):
+        prefetch_related_objects([cart], *cart_items_prefetch())
+        return self.get_serializer(cart).data
+
     @action(detail=False, methods=["get"])
     def my_cart(self, request):
         # Check cache first
         user_id = request.user.id
         cached_data = cached_user_cart(user_id)
 
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
 
         # If not in cache, get from database
-        cart = self.get_or_create_cart()
-        serializer = self.get_serializer(cart)
-        data = serializer.data
+        cart = self.get_or_create_cart(prefetch=True)
+        data = self.serialize_cart(cart)
 
         # Cache result
         cache_user_cart(user_id, data)
@@ -51,45 +83,67 @@ class CartViewSet(viewsets.GenericViewSet):
             product_id = serializer.validated_data["product_id"]
             quantity = serializer.validated_data["quantity"]
 
-            product = Product.objects.get(id=product_id)
-
-            # Check if product is in stock
-            if quantity > product.stock:
-                return Response(
-                    {"detail": f"Only {product.stock} items available"},
-                    status=status.HTTP_400_BAD_REQUEST,
+            with transaction.atomic():
+                # Lock the product row so concurrent adds see a stable stock
+                stock = (
+                    Product.objects.select_for_update()
+                    .filter(pk=product_id)
+                    .values_list("stock", flat=True)
+                    .get()
                 )
 
-            # Check if item is already in cart
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart, product=product, defaults={"quantity": quantity}
-            )
+                # Insert the item or add to the quantity already in the cart
+                new_quantity = CartItem.objects.add_quantity(
+                    cart.id, product_id, quantity
+                )
 
-            # If item exists, update quantity
-            if not created:
-                cart_item.quantity += quantity
-                if cart_item.quantity > product.stock:
+                if new_quantity > stock:
+                    transaction.set_rollback(True)
                     return Response(
                         {
-                            "detail": f"Only {product.stock} items available. You already have {cart_item.quantity - quantity} in your cart."
+                            "detail": f"Only {stock} items available. You already have {new_quantity - quantity} in your cart."
                         },
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                cart_item.save()
 
             # Invalidate cart cache
             invalidate_user_cart(request.user.id)
 
             # Get updated cart
-            cart_serializer = self.get_serializer(cart)
-            return Response(cart_serializer.data)
+            return Response(self.serialize_cart(cart))
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"])
+    def add_items(self, request):
+        cart = self.get_or_create_cart()
+        serializer = AddItemsToCartSerializer(data=request.data)
+
+        if serializer.is_valid():
+            items = [
+                (item["product_id"], item["quantity"])
+                for item in serializer.validated_data["items"]
+            ]
+
+            try:
+                cart.add_items(items)
+            except ValidationError as e:
+                return Response(
+                    {"detail": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Invalidate cart cache
+            invalidate_user_cart(request.user.id)
+
+            # Get updated cart
+            return Response(self.serialize_cart(cart))
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=["delete"])
     def clear(self, request):
-        cart = self.get_or_create_cart()
-        cart.items.all().delete()
+        # A single DELETE; CartItem has no signals or dependents to collect
+        CartItem.objects.filter(cart__user=request.user).delete()
 
         # Invalidate cart cache
         invalidate_user_cart(request.user.id)
@@ -128,7 +182,7 @@ class CartItemViewSet(viewsets.GenericViewSet):
                 )
 
             cart_item.quantity = new_quantity
-            cart_item.save()
+            cart_item.save(update_fields=["quantity", "updated_at"])
 
             # Invalidate cart cache
             invalidate_user_cart(request.user.id)
@@ -1,7 +1,7 @@
 from django.core.cache import cache
 from django.conf import settings
 import hashlib
-import json
+import time
 
 # Cache timeouts (in seconds)
 CACHE_TTL = {
@@ -15,6 +15,19 @@ CACHE_TTL = {
     "recently_viewed": 60 * 5,  # 5 minutes
 }
 
+# Bumped on every product change so all cached product lists are orphaned at
+# once, including lists the changed product has only just started to match
+PRODUCT_LISTS_GENERATION_KEY = "generation:product_lists"
+
+# Key hashes only namespace entries, so a short digest is enough; blake2b
+# produces one of the requested size directly
+KEY_DIGEST_SIZE = 12
+
+
+def hash_key_part(value):
+    """Hash a string into a short hex digest for use inside cache keys"""
+    return hashlib.blake2b(value.encode(), digest_size=KEY_DIGEST_SIZE).hexdigest()
+
 
 def get_cache_key(prefix, identifier, params=None):
     """
@@ -31,10 +44,9 @@ def get_cache_key(prefix, identifier, params=None):
     key = f"{prefix}:{identifier}"
 
     if params:
-        # Sort params to ensure consistent key generation
-        serialized_params = json.dumps(params, sort_keys=True)
-        param_hash = hashlib.md5(serialized_params.encode()).hexdigest()
-        key = f"{key}:{param_hash}"
+        # Sort params to ensure consistent key generation; repr quotes strings,
+        # so value types and separators stay unambiguous
+        key = f"{key}:{hash_key_part(repr(tuple(sorted(params.items()))))}"
 
     return key
 
@@ -51,69 +63,90 @@ def cache_product_detail(product_id, data):
     cache.set(cache_key, data, CACHE_TTL["product_detail"])
 
 
+def _product_lists_generation():
+    """Get the current generation of the product list caches"""
+    generation = cache.get(PRODUCT_LISTS_GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost counter never revives old entries
+        cache.add(PRODUCT_LISTS_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(PRODUCT_LISTS_GENERATION_KEY)
+    return generation
+
+
+def get_product_list_cache_key(prefix, identifier, params=None):
+    """Generate a cache key for a list that may contain any product"""
+    prefix = f"{prefix}:g{_product_lists_generation()}"
+    return get_cache_key(prefix, identifier, params)
+
+
 def invalidate_product_cache(product_id):
     """Invalidate all product-related caches for a specific product"""
     # Invalidate product detail
     cache_key = get_cache_key("product", product_id)
     cache.delete(cache_key)
 
-    # Invalidate product list caches - using wildcard deletion
-    cache.delete_pattern("product_list:*")
-    cache.delete_pattern("category_products:*")
-    cache.delete_pattern("search_results:*")
-    cache.delete_pattern("recommendations:*")
+    # Orphan every product list cache, since an update can move the product
+    # into lists that did not contain it before; stale entries expire on TTL
+    try:
+        cache.incr(PRODUCT_LISTS_GENERATION_KEY)
+    except ValueError:
+        cache.add(PRODUCT_LISTS_GENERATION_KEY, time.time_ns(), timeout=None)
 
 
 def cached_product_list(filters=None):
     """Get cached product list or None if not in cache"""
-    cache_key = get_cache_key("product_list", "all", filters)
+    cache_key = get_product_list_cache_key("product_list", "all", filters)
     return cache.get(cache_key)
 
 
 def cache_product_list(data, filters=None):
     """Cache product list"""
-    cache_key = get_cache_key("product_list", "all", filters)
+    cache_key = get_product_list_cache_key("product_list", "all", filters)
     cache.set(cache_key, data, CACHE_TTL["product_list"])
 
 
 def cached_category_products(category_id, filters=None):
     """Get cached category products or None if not in cache"""
-    cache_key = get_cache_key("category_products", category_id, filters)
+    cache_key = get_product_list_cache_key("category_products", category_id, filters)
     return cache.get(cache_key)
 
 
 def cache_category_products(category_id, data, filters=None):
     """Cache category products"""
-    cache_key = get_cache_key("category_products", category_id, filters)
+    cache_key = get_product_list_cache_key("category_products", category_id, filters)
     cache.set(cache_key, data, CACHE_TTL["category_products"])
 
 
 def cached_search_results(query, filters=None):
     """Get cached search results or None if not in cache"""
     # Generate a hash of the query to use as part of the key
-    query_hash = hashlib.md5(query.encode()).hexdigest()
-    cache_key = get_cache_key("search_results", query_hash, filters)
+    query_hash = hash_key_part(query)
+    cache_key = get_product_list_cache_key("search_results", query_hash, filters)
     return cache.get(cache_key)
 
 
 def cache_search_results(query, data, filters=None):
     """Cache search results"""
-    query_hash = hashlib.md5(query.encode()).hexdigest()
-    cache_key = get_cache_key("search_results", query_hash, filters)
+    query_hash = hash_key_part(query)
+    cache_key = get_product_list_cache_key("search_results", query_hash, filters)
     cache.set(cache_key, data, CACHE_TTL["search_results"])
 
 
 def cached_recommendations(key_type, key_id, limit=5):
     """Get cached recommendations or None if not in cache"""
     filters = {"limit": limit}
-    cache_key = get_cache_key(f"recommendations_{key_type}", key_id, filters)
+    cache_key = get_product_list_cache_key(
+        f"recommendations_{key_type}", key_id, filters
+    )
     return cache.get(cache_key)
 
 
 def cache_recommendations(key_type, key_id, data, limit=5):
     """Cache recommendations"""
     filters = {"limit": limit}
-    cache_key = get_cache_key(f"recommendations_{key_type}", key_id, filters)
+    cache_key = get_product_list_cache_key(
+        f"recommendations_{key_type}", key_id, filters
+    )
     cache.set(cache_key, data, CACHE_TTL["recommendations"])
 
 
@@ -169,3 +202,14 @@ def invalidate_recently_viewed(user_id):
     """Invalidate recently viewed products cache"""
     cache_key = get_cache_key("recently_viewed", user_id)
     cache.delete(cache_key)
+
+
+# Per-user caches that are invalidated together
+USER_BUNDLE_CACHES = ("cart", "wishlist", "recently_viewed")
+
+
+def invalidate_user_bundle(user_id, names=None):
+    """Invalidate several per-user caches with a single DEL"""
+    cache.delete_many(
+        [get_cache_key(name, user_id) for name in names or USER_BUNDLE_CACHES]
+    )
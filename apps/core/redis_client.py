@@ -1,5 +1,8 @@
 from django_redis.client import DefaultClient
 
+# Keys are scanned and unlinked in batches of this size
+DELETE_PATTERN_BATCH_SIZE = 500
+
 
 class CustomRedisClient(DefaultClient):
     """
@@ -8,10 +11,20 @@ class CustomRedisClient(DefaultClient):
 
     def delete_pattern(self, pattern, **kwargs):
         """
-        Delete all keys matching pattern
+        Delete all keys matching pattern.
+        Uses SCAN instead of KEYS so Redis is never blocked walking the whole
+        keyspace, and UNLINK so memory is reclaimed in the background.
         """
+        client = self.get_client()
         pattern = self.make_key(pattern)
-        keys = self.get_client().keys(pattern)
-        if keys:
-            self.get_client().delete(*keys)
-        return len(keys)
+        pipeline = client.pipeline(transaction=False)
+        deleted = 0
+
+        for key in client.scan_iter(match=pattern, count=DELETE_PATTERN_BATCH_SIZE):
+            pipeline.unlink(key)
+            deleted += 1
+            if deleted % DELETE_PATTERN_BATCH_SIZE == 0:
+                pipeline.execute()
+
+        pipeline.execute()
+        return deleted
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:04
+
+import apps.orders.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_number',
+            field=models.CharField(default=apps.orders.models.generate_order_number, editable=False, max_length=20, unique=True),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.products.models import Product
@@ -5,6 +6,11 @@ from apps.products.models import Product
 User = get_user_model()
 
 
+def generate_order_number():
+    """Random order number, generated without querying existing orders"""
+    return f"ORD-{uuid.uuid4().hex[:12].upper()}"
+
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ("pending", "Pending"),
@@ -15,7 +21,9 @@ class Order(models.Model):
     )
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="orders")
-    order_number = models.CharField(max_length=20, unique=True, editable=False)
+    order_number = models.CharField(
+        max_length=20, unique=True, editable=False, default=generate_order_number
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
 
     # Shipping details
@@ -63,19 +71,16 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number}"
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Generate a unique order number
-            last_order = Order.objects.order_by("-id").first()
-            if last_order:
-                last_id = last_order.id
-            else:
-                last_id = 0
-            self.order_number = f"ORD-{last_id + 1:06d}"
+            self.order_number = generate_order_number()
 
         if not self.total:
             self.total = self.subtotal + self.shipping_cost + self.tax
@@ -1,18 +1,40 @@
 from rest_framework import serializers
 from decimal import Decimal
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from .models import Order, OrderItem
+from .tasks import post_order_created
+from apps.products.models import Product
 from apps.products.serializers import ProductSerializer
 from apps.accounts.serializers import AddressSerializer
 from apps.accounts.models import Address
-from apps.cart.models import Cart
+from apps.cart.models import Cart, CartItem
+
+# Order items are inserted in batches of this size
+ORDER_ITEM_BATCH_SIZE = 50
+
+# Tax charged on the order subtotal
+TAX_RATE = Decimal("0.10")
+
+
+def _address_attrs(prefix, address, name):
+    """Order fields snapshotting an address under the given prefix"""
+    return {
+        f"{prefix}_address": address,
+        f"{prefix}_name": name,
+        f"{prefix}_address_line": address.street_address,
+        f"{prefix}_city": address.city,
+        f"{prefix}_state": address.state,
+        f"{prefix}_postal_code": address.postal_code,
+        f"{prefix}_country": address.country,
+    }
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         source="product",
-        queryset=ProductSerializer.Meta.model.objects.all(),
+        queryset=Product.objects.filter(is_active=True).only("id"),
         write_only=True,
     )
 
@@ -29,6 +51,21 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ["unit_price", "total_price"]
 
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """Scalar order fields for list endpoints, without items or addresses"""
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "order_number",
+            "status",
+            "payment_status",
+            "total",
+            "created_at",
+        ]
+
+
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     shipping_address_details = AddressSerializer(
@@ -40,7 +77,38 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = "__all__"
+        fields = [
+            "id",
+            "items",
+            "shipping_address_details",
+            "billing_address_details",
+            "order_number",
+            "status",
+            "shipping_name",
+            "shipping_address_line",
+            "shipping_city",
+            "shipping_state",
+            "shipping_postal_code",
+            "shipping_country",
+            "billing_name",
+            "billing_address_line",
+            "billing_city",
+            "billing_state",
+            "billing_postal_code",
+            "billing_country",
+            "subtotal",
+            "shipping_cost",
+            "tax",
+            "total",
+            "payment_status",
+            "payment_method",
+            "payment_id",
+            "created_at",
+            "updated_at",
+            "user",
+            "shipping_address",
+            "billing_address",
+        ]
         read_only_fields = [
             "order_number",
             "subtotal",
@@ -75,51 +143,38 @@ class OrderCreateSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         # Request context is crucial here to get the user
         user = self.context.get("request").user
+        full_name = f"{user.first_name} {user.last_name}"
 
-        # Validate shipping address belongs to user
+        # Fetch both addresses in one query; each must belong to the user and
+        # be of the right type
         shipping_address_id = attrs.get("shipping_address_id")
-        try:
-            shipping_address = Address.objects.get(
-                id=shipping_address_id, user=user, address_type="shipping"
-            )
-            attrs["shipping_address"] = shipping_address
-            attrs["shipping_name"] = f"{user.first_name} {user.last_name}"
-            attrs["shipping_address_line"] = shipping_address.street_address
-            attrs["shipping_city"] = shipping_address.city
-            attrs["shipping_state"] = shipping_address.state
-            attrs["shipping_postal_code"] = shipping_address.postal_code
-            attrs["shipping_country"] = shipping_address.country
-        except Address.DoesNotExist:
+        billing_address_id = attrs.get("billing_address_id")
+        address_ids = {shipping_address_id}
+        if not attrs.get("use_shipping_for_billing"):
+            address_ids.add(billing_address_id)
+        addresses = {
+            address.id: address
+            for address in Address.objects.filter(user=user, id__in=address_ids)
+        }
+
+        # Validate shipping address belongs to user
+        shipping_address = addresses.get(shipping_address_id)
+        if shipping_address is None or shipping_address.address_type != "shipping":
             raise serializers.ValidationError(
                 {"shipping_address_id": "Invalid shipping address"}
             )
+        attrs.update(_address_attrs("shipping", shipping_address, full_name))
 
         # Handle billing address
         if attrs.get("use_shipping_for_billing"):
-            attrs["billing_address"] = shipping_address
-            attrs["billing_name"] = attrs["shipping_name"]
-            attrs["billing_address_line"] = attrs["shipping_address_line"]
-            attrs["billing_city"] = attrs["shipping_city"]
-            attrs["billing_state"] = attrs["shipping_state"]
-            attrs["billing_postal_code"] = attrs["shipping_postal_code"]
-            attrs["billing_country"] = attrs["shipping_country"]
+            billing_address = shipping_address
         else:
-            billing_address_id = attrs.get("billing_address_id")
-            try:
-                billing_address = Address.objects.get(
-                    id=billing_address_id, user=user, address_type="billing"
-                )
-                attrs["billing_address"] = billing_address
-                attrs["billing_name"] = f"{user.first_name} {user.last_name}"
-                attrs["billing_address_line"] = billing_address.street_address
-                attrs["billing_city"] = billing_address.city
-                attrs["billing_state"] = billing_address.state
-                attrs["billing_postal_code"] = billing_address.postal_code
-                attrs["billing_country"] = billing_address.country
-            except Address.DoesNotExist:
+            billing_address = addresses.get(billing_address_id)
+            if billing_address is None or billing_address.address_type != "billing":
                 raise serializers.ValidationError(
                     {"billing_address_id": "Invalid billing address"}
                 )
+        attrs.update(_address_attrs("billing", billing_address, full_name))
 
         # Remove temporary fields
         attrs.pop("use_shipping_for_billing", None)
@@ -132,45 +187,65 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         # Get the user from the context
         user = self.context.get("request").user
 
-        # Get the cart - user OneToOneField relationship with related_name="cart"
-        try:
-            cart = user.cart
-        except Cart.DoesNotExist:
-            # Create a cart if it doesn't exist
-            cart = Cart.objects.create(user=user)
-
-        if not cart or not cart.items.exists():
-            raise serializers.ValidationError({"cart": "Cart is empty"})
-
-        # Calculate order totals
-        subtotal = cart.subtotal
-        shipping_cost = validated_data.pop("shipping_cost", 0)
-
-        # Use Decimal instead of float for tax calculation to avoid type error
-        tax = subtotal * Decimal("0.1")
-        total = subtotal + shipping_cost + tax
-
-        # Create order with user explicitly passed
-        order = Order.objects.create(
-            user=user,
-            subtotal=subtotal,
-            shipping_cost=shipping_cost,
-            tax=tax,
-            total=total,
-            **validated_data,
-        )
-
-        # Create order items from cart
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                unit_price=cart_item.unit_price,
-                total_price=cart_item.total_price,
+        with transaction.atomic():
+            # Lock the cart so a double submit or a concurrent add-to-cart
+            # waits for this order. The items are loaded with their products
+            # once; the emptiness check, the subtotal and the order items all
+            # reuse them.
+            cart = (
+                Cart.objects.select_for_update()
+                .filter(user=user)
+                .prefetch_related(
+                    Prefetch(
+                        "items",
+                        queryset=CartItem.objects.select_related(
+                            "product"
+                        ).with_total_price(),
+                    )
+                )
+                .first()
             )
 
-        # Clear cart after order creation
-        cart.items.all().delete()
+            if cart is None or not cart.items.all():
+                raise serializers.ValidationError({"cart": "Cart is empty"})
+
+            # Calculate order totals; the item totals were computed by the
+            # database along with the items, so this only adds them up
+            subtotal = cart.subtotal
+            shipping_cost = validated_data.pop("shipping_cost", 0)
+
+            tax = subtotal * TAX_RATE
+            total = subtotal + shipping_cost + tax
+
+            # Create order with user explicitly passed
+            order = Order.objects.create(
+                user=user,
+                subtotal=subtotal,
+                shipping_cost=shipping_cost,
+                tax=tax,
+                total=total,
+                **validated_data,
+            )
+
+            # Create order items from cart in a single INSERT per batch
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        product=cart_item.product,
+                        quantity=cart_item.quantity,
+                        unit_price=cart_item.unit_price,
+                        total_price=cart_item.total_price,
+                    )
+                    for cart_item in cart.items.all()
+                ],
+                batch_size=ORDER_ITEM_BATCH_SIZE,
+            )
+
+            # Clear cart after order creation
+            cart.items.all().delete()
+
+            # Notify the customer once the order is committed
+            transaction.on_commit(lambda: post_order_created.delay(order.id))
 
         return order
@@ -0,0 +1,33 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+import logging
+
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def post_order_created(order_id):
+    """
+    Run the follow-up work for a newly placed order outside the request,
+    currently the confirmation email to the customer.
+    """
+    try:
+        order = Order.objects.select_related("user").get(id=order_id)
+    except Order.DoesNotExist:
+        logger.warning(f"Order {order_id} no longer exists, skipping follow-up")
+        return
+
+    send_mail(
+        subject=f"Order {order.order_number} confirmed",
+        message=(
+            f"Hi {order.shipping_name},\n\n"
+            f"Thank you for your order {order.order_number}. "
+            f"Your total is {order.total}.\n"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[order.user.email],
+    )
+    logger.info(f"Sent confirmation for order {order.order_number}")
@@ -2,8 +2,26 @@ from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
 from .models import Order, OrderItem
-from .serializers import OrderSerializer, OrderCreateSerializer, OrderItemSerializer
+from .serializers import (
+    OrderSerializer,
+    OrderCreateSerializer,
+    OrderItemSerializer,
+    OrderListSerializer,
+)
+
+# Actions that return many orders and use the lightweight list serializer
+LIST_ACTIONS = ("list", "my_orders")
+
+
+def order_items_queryset():
+    """Order items with everything their serializer reads loaded up front"""
+    return OrderItem.objects.select_related("product__category").prefetch_related(
+        "product__images", "product__reviews"
+    )
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -16,13 +34,20 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Order.objects.all()
+        if self.action not in LIST_ACTIONS:
+            queryset = queryset.select_related(
+                "shipping_address", "billing_address"
+            ).prefetch_related(Prefetch("items", queryset=order_items_queryset()))
         if user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
 
     def get_serializer_class(self):
         if self.action == "create":
             return OrderCreateSerializer
+        if self.action in LIST_ACTIONS:
+            return OrderListSerializer
         return OrderSerializer
 
     # Simply call save() without passing context parameter
@@ -31,18 +56,25 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["post"])
     def cancel(self, request, pk=None):
-        order = self.get_object()
-
-        # Only pending and processing orders can be cancelled
-        if order.status not in ["pending", "processing"]:
-            return Response(
-                {"detail": "Cannot cancel this order as it is already processed"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Update order status
-        order.status = "cancelled"
-        order.save()
+        orders = Order.objects.select_for_update()
+        if not request.user.is_staff:
+            orders = orders.filter(user=request.user)
+
+        with transaction.atomic():
+            # Lock the row so a concurrent status change can't be overwritten
+            order = get_object_or_404(orders, pk=pk)
+            self.check_object_permissions(request, order)
+
+            # Only pending and processing orders can be cancelled
+            if order.status not in ["pending", "processing"]:
+                return Response(
+                    {"detail": "Cannot cancel this order as it is already processed"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Update order status
+            order.status = "cancelled"
+            order.save(update_fields=["status", "updated_at"])
 
         # Return updated order
         serializer = self.get_serializer(order)
@@ -50,7 +82,10 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def my_orders(self, request):
-        queryset = self.get_queryset().filter(user=request.user)
+        queryset = self.get_queryset()
+        if request.user.is_staff:
+            # Staff querysets span every user's orders
+            queryset = queryset.filter(user=request.user)
         page = self.paginate_queryset(queryset)
 
         if page is not None:
@@ -68,15 +103,14 @@ class OrderItemViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         user = self.request.user
 
-        if user.is_staff:
-            return OrderItem.objects.all()
+        queryset = order_items_queryset()
 
+        # Items of one order when nested under it; the ownership check is
+        # part of the same query rather than a separate order lookup
         order_id = self.kwargs.get("order_pk")
         if order_id:
-            try:
-                order = Order.objects.get(id=order_id, user=user)
-                return OrderItem.objects.filter(order=order)
-            except Order.DoesNotExist:
-                return OrderItem.objects.none()
+            queryset = queryset.filter(order_id=order_id)
 
-        return OrderItem.objects.filter(order__user=user)
+        if user.is_staff:
+            return queryset
+        return queryset.filter(order__user=user)
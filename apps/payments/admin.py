@@ -15,6 +15,10 @@ class RefundInline(admin.TabularInline):
     )
     can_delete = False
 
+    def get_queryset(self, request):
+        # Each row's label is Refund.__str__, which reads the payment
+        return super().get_queryset(request).select_related("payment")
+
     def has_add_permission(self, request, obj):
         return False
 
@@ -28,6 +32,7 @@ class PaymentAdmin(admin.ModelAdmin):
         "payment_method",
         "created_at",
     )
+    list_select_related = ("order",)
     list_filter = ("status", "payment_method", "created_at")
     search_fields = ("payment_id", "order__order_number", "order__user__email")
     readonly_fields = (
@@ -48,6 +53,7 @@ class PaymentAdmin(admin.ModelAdmin):
 
 class RefundAdmin(admin.ModelAdmin):
     list_display = ("refund_id", "payment", "amount", "status", "created_at")
+    list_select_related = ("payment__order",)
     list_filter = ("status", "created_at")
     search_fields = ("refund_id", "payment__payment_id", "payment__order__order_number")
     readonly_fields = (
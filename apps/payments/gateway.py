@@ -0,0 +1,14 @@
+from django.conf import settings
+from functools import lru_cache
+import razorpay
+
+
+@lru_cache(maxsize=None)
+def get_razorpay_client():
+    """
+    Shared Razorpay client, so every request reuses the same HTTP session
+    and its kept-alive connection to the Razorpay API
+    """
+    return razorpay.Client(
+        auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_payment_refund_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='refund',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('processed', 'Processed'), ('rejected', 'Rejected')], default='pending', max_length=20),
+        ),
+    ]
@@ -25,6 +25,11 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "-created_at"]),
+            models.Index(fields=["payment_method"]),
+            models.Index(fields=["-created_at"]),
+        ]
 
     def __str__(self):
         return f"Payment {self.payment_id} for Order {self.order.order_number}"
@@ -33,6 +38,7 @@ class Payment(models.Model):
 class Refund(models.Model):
     STATUS_CHOICES = (
         ("pending", "Pending"),
+        ("processing", "Processing"),
         ("processed", "Processed"),
         ("rejected", "Rejected"),
     )
@@ -47,5 +53,11 @@ class Refund(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-created_at"]),
+            models.Index(fields=["-created_at"]),
+        ]
+
     def __str__(self):
         return f"Refund {self.refund_id} for Payment {self.payment.payment_id}"
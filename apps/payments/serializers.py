@@ -1,14 +1,39 @@
 from rest_framework import serializers
+from decimal import Decimal
 from .models import Payment, Refund
-from apps.orders.serializers import OrderSerializer
+from apps.orders.models import Order
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        fields = ["id", "order_number", "total", "status"]
+
+
+class PaymentSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Payment
+        fields = ["id", "amount", "status"]
 
 
 class PaymentSerializer(serializers.ModelSerializer):
-    order_details = OrderSerializer(source="order", read_only=True)
+    order_details = OrderSummarySerializer(source="order", read_only=True)
 
     class Meta:
         model = Payment
-        fields = "__all__"
+        fields = [
+            "id",
+            "order_details",
+            "payment_id",
+            "amount",
+            "currency",
+            "status",
+            "payment_method",
+            "razorpay_order_id",
+            "created_at",
+            "updated_at",
+            "order",
+        ]
         read_only_fields = ["created_at", "updated_at"]
 
 
@@ -25,16 +50,15 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
             "razorpay_signature",
         ]
 
-    def validate(self, attrs):
-        # Ensure order belongs to the current user
+    def get_fields(self):
+        fields = super().get_fields()
+        # Only the current user's orders are valid choices
         request = self.context.get("request")
-        if request and request.user:
-            order = attrs.get("order")
-            if order.user != request.user:
-                raise serializers.ValidationError(
-                    {"order": "Order doesn't belong to the current user"}
-                )
-        return attrs
+        if request and request.user.is_authenticated:
+            fields["order"].queryset = Order.objects.filter(user=request.user).only(
+                "id", "user_id"
+            )
+        return fields
 
 
 class PaymentVerifySerializer(serializers.Serializer):
@@ -44,11 +68,21 @@ class PaymentVerifySerializer(serializers.Serializer):
 
 
 class RefundSerializer(serializers.ModelSerializer):
-    payment_details = PaymentSerializer(source="payment", read_only=True)
+    payment_details = PaymentSummarySerializer(source="payment", read_only=True)
 
     class Meta:
         model = Refund
-        fields = "__all__"
+        fields = [
+            "id",
+            "payment_details",
+            "refund_id",
+            "amount",
+            "reason",
+            "status",
+            "created_at",
+            "updated_at",
+            "payment",
+        ]
         read_only_fields = ["refund_id", "created_at", "updated_at"]
 
 
@@ -56,20 +90,22 @@ class RefundCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Refund
         fields = ["payment", "amount", "reason"]
+        extra_kwargs = {"amount": {"min_value": Decimal("0.01")}}
 
-    def validate(self, attrs):
-        # Ensure payment belongs to the current user
+    def get_fields(self):
+        fields = super().get_fields()
+        # Only payments for the current user's orders are valid choices
         request = self.context.get("request")
-        if request and request.user:
-            payment = attrs.get("payment")
-            if payment.order.user != request.user:
-                raise serializers.ValidationError(
-                    {"payment": "Payment doesn't belong to the current user"}
-                )
-
-            # Ensure amount is not greater than payment amount
-            if attrs.get("amount") > payment.amount:
-                raise serializers.ValidationError(
-                    {"amount": "Refund amount cannot be greater than payment amount"}
-                )
+        if request and request.user.is_authenticated:
+            fields["payment"].queryset = Payment.objects.filter(
+                order__user=request.user
+            ).only("id", "amount")
+        return fields
+
+    def validate(self, attrs):
+        # Ensure amount is not greater than payment amount
+        if attrs.get("amount") > attrs.get("payment").amount:
+            raise serializers.ValidationError(
+                {"amount": "Refund amount cannot be greater than payment amount"}
+            )
         return attrs
@@ -0,0 +1,75 @@
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+import razorpay
+import requests
+
+from .gateway import get_razorpay_client
+from .models import Refund
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def process_refund(self, refund_id):
+    """
+    Submit a pending refund to Razorpay and record the outcome. A full
+    refund also marks the payment refunded and cancels the order.
+    """
+    # Claim the refund so concurrent or redelivered runs never submit it twice
+    claimed = Refund.objects.filter(id=refund_id, status="pending").update(
+        status="processing", updated_at=timezone.now()
+    )
+    if not claimed:
+        logger.warning(f"Refund {refund_id} is missing or not pending, skipping")
+        return
+
+    refund = Refund.objects.select_related("payment__order").get(id=refund_id)
+    payment = refund.payment
+    try:
+        result = get_razorpay_client().payment.refund(
+            payment.payment_id,
+            {
+                "amount": int(refund.amount * 100),  # Convert to paise
+                "notes": {"reason": refund.reason, "order_id": str(payment.order_id)},
+            },
+        )
+
+        with transaction.atomic():
+            refund.refund_id = result["id"]
+            refund.status = "processed"
+            refund.save(update_fields=["refund_id", "status", "updated_at"])
+
+            # Update payment and order status if fully refunded
+            if refund.amount >= payment.amount:
+                payment.status = "refunded"
+                payment.save(update_fields=["status", "updated_at"])
+
+                payment.order.status = "cancelled"
+                payment.order.save(update_fields=["status", "updated_at"])
+    except (
+        razorpay.errors.BadRequestError,
+        razorpay.errors.GatewayError,
+        razorpay.errors.ServerError,
+    ) as e:
+        logger.error(f"Refund {refund.refund_id} rejected by Razorpay: {e}")
+        refund.status = "rejected"
+        refund.save(update_fields=["status", "updated_at"])
+        return
+    except requests.exceptions.RequestException as e:
+        # Razorpay never answered, so release the claim and try again later
+        logger.warning(f"Refund {refund.refund_id} could not reach Razorpay: {e}")
+        refund.status = "pending"
+        refund.save(update_fields=["status", "updated_at"])
+        raise self.retry(exc=e)
+    except Exception:
+        # Razorpay may already have issued the refund, so never leave it
+        # claimable again; reject it for staff to reconcile instead
+        logger.exception(f"Refund {refund_id} failed unexpectedly")
+        refund.status = "rejected"
+        refund.save(update_fields=["status", "updated_at"])
+        raise
+
+    logger.info(f"Processed refund {refund.refund_id} for payment {payment.payment_id}")
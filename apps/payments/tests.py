@@ -1,83 +1,57 @@
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
+from celery.exceptions import Retry
 from .models import Payment, Refund
-from apps.accounts.models import User, Address
-from apps.products.models import Category, Product
-from apps.cart.models import Cart, CartItem
+from .gateway import get_razorpay_client
+from .tasks import process_refund
+from apps.accounts.models import User
 from apps.orders.models import Order
+import hashlib
+import hmac
 import json
+import razorpay
+import requests
 
 
 class PaymentsAPITestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Patch the Razorpay client once for the whole class
+        patcher = patch("apps.payments.gateway.razorpay.Client")
+        cls.mock_razorpay = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    @classmethod
+    def setUpTestData(cls):
         # Create test user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             email="user@example.com",
             password="user12345",
             first_name="Test",
             last_name="User",
         )
 
-        # Create addresses for the user
-        self.shipping_address = Address.objects.create(
-            user=self.user,
-            address_type="shipping",
-            street_address="123 Shipping St",
-            city="Shipping City",
-            state="Shipping State",
-            postal_code="12345",
-            country="Shipping Country",
-            is_default=True,
-        )
-
-        self.billing_address = Address.objects.create(
-            user=self.user,
-            address_type="billing",
-            street_address="456 Billing St",
-            city="Billing City",
-            state="Billing State",
-            postal_code="67890",
-            country="Billing Country",
-            is_default=True,
-        )
-
-        # Create category
-        self.category = Category.objects.create(
-            name="Test Category", description="Test category description"
-        )
-
-        # Create products
-        self.product = Product.objects.create(
-            name="Test Product",
-            description="Test product description",
-            category=self.category,
-            price=99.99,
-            stock=10,
-            is_active=True,
-        )
-
-        # Create an order
-        self.order = Order.objects.create(
-            user=self.user,
-            shipping_address=self.shipping_address,
-            billing_address=self.billing_address,
-            shipping_name=f"{self.user.first_name} {self.user.last_name}",
-            shipping_address_line=self.shipping_address.street_address,
-            shipping_city=self.shipping_address.city,
-            shipping_state=self.shipping_address.state,
-            shipping_postal_code=self.shipping_address.postal_code,
-            shipping_country=self.shipping_address.country,
-            billing_name=f"{self.user.first_name} {self.user.last_name}",
-            billing_address_line=self.billing_address.street_address,
-            billing_city=self.billing_address.city,
-            billing_state=self.billing_address.state,
-            billing_postal_code=self.billing_address.postal_code,
-            billing_country=self.billing_address.country,
+        # Create an order; payments only read its user and totals, so the
+        # address snapshot is filled in without saved addresses or products
+        cls.order = Order.objects.create(
+            user=cls.user,
+            shipping_name=f"{cls.user.first_name} {cls.user.last_name}",
+            shipping_address_line="123 Shipping St",
+            shipping_city="Shipping City",
+            shipping_state="Shipping State",
+            shipping_postal_code="12345",
+            shipping_country="Shipping Country",
+            billing_name=f"{cls.user.first_name} {cls.user.last_name}",
+            billing_address_line="456 Billing St",
+            billing_city="Billing City",
+            billing_state="Billing State",
+            billing_postal_code="67890",
+            billing_country="Billing Country",
             subtotal=99.99,
             shipping_cost=10.00,
             tax=10.00,
@@ -85,49 +59,45 @@ class PaymentsAPITestCase(TestCase):
         )
 
         # Test payment data
-        self.payment_data = {"order_id": self.order.id}
+        cls.payment_data = {"order_id": cls.order.id}
 
         # Mock Razorpay order response
-        self.mock_razorpay_order = {
+        cls.mock_razorpay_order = {
             "id": "order_test123",
             "amount": 11999,  # in paise (119.99 * 100)
             "currency": "INR",
         }
 
-        # Mock Razorpay payment response
-        self.mock_razorpay_payment = {
-            "id": "pay_test123",
-            "order_id": "order_test123",
-            "amount": 11999,
-            "currency": "INR",
-            "status": "captured",
-        }
-
-        # Mock verification data
-        self.verification_data = {
+        # Verification data signed the way Razorpay signs it
+        signature = hmac.new(
+            settings.RAZORPAY_KEY_SECRET.encode(),
+            b"order_test123|pay_test123",
+            hashlib.sha256,
+        ).hexdigest()
+        cls.verification_data = {
             "razorpay_payment_id": "pay_test123",
             "razorpay_order_id": "order_test123",
-            "razorpay_signature": "test_signature",
+            "razorpay_signature": signature,
         }
 
+    def setUp(self):
+        self.client = APIClient()
+        # Give each test a fresh Razorpay mock and drop the shared client
+        # built from the previous one
+        self.razorpay_client = MagicMock()
+        self.mock_razorpay.return_value = self.razorpay_client
+        get_razorpay_client.cache_clear()
+
     def authenticate_user(self):
         """Helper method to authenticate user"""
-        response = self.client.post(
-            reverse("token_obtain_pair"),
-            {"email": "user@example.com", "password": "user12345"},
-            format="json",
-        )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.client.force_authenticate(user=self.user)
 
-    @patch("razorpay.Client")
-    def test_create_razorpay_order(self, mock_razorpay):
+    def test_create_razorpay_order(self):
         """Test creating a Razorpay order"""
         self.authenticate_user()
 
         # Mock Razorpay client
-        mock_client = MagicMock()
-        mock_razorpay.return_value = mock_client
-        mock_client.order.create.return_value = self.mock_razorpay_order
+        self.razorpay_client.order.create.return_value = self.mock_razorpay_order
 
         url = reverse("payment-create-razorpay-order")
         response = self.client.post(url, {"order_id": self.order.id}, format="json")
@@ -138,26 +108,21 @@ class PaymentsAPITestCase(TestCase):
         self.assertEqual(response.data["currency"], "INR")
 
         # Verify Razorpay client was called correctly
-        mock_client.order.create.assert_called_once()
-        call_args = mock_client.order.create.call_args[0][0]
+        self.razorpay_client.order.create.assert_called_once()
+        call_args = self.razorpay_client.order.create.call_args[0][0]
         self.assertEqual(call_args["amount"], 11999)
         self.assertEqual(call_args["currency"], "INR")
         self.assertEqual(call_args["receipt"], self.order.order_number)
 
-    @patch("razorpay.Client")
-    def test_verify_payment(self, mock_razorpay):
+    def test_verify_payment(self):
         """Test verifying a Razorpay payment"""
         self.authenticate_user()
 
         # Mock Razorpay client
-        mock_client = MagicMock()
-        mock_razorpay.return_value = mock_client
-        mock_client.utility.verify_payment_signature.return_value = None  # No error
-        mock_client.order.fetch.return_value = {
+        self.razorpay_client.order.fetch.return_value = {
             "id": "order_test123",
             "notes": {"order_id": str(self.order.id)},
         }
-        mock_client.payment.fetch.return_value = self.mock_razorpay_payment
 
         url = reverse("payment-verify-payment")
         response = self.client.post(url, self.verification_data, format="json")
@@ -170,6 +135,8 @@ class PaymentsAPITestCase(TestCase):
         self.assertEqual(payment.order, self.order)
         self.assertEqual(payment.payment_id, "pay_test123")
         self.assertEqual(payment.status, "completed")
+        self.assertEqual(payment.currency, "INR")
+        self.razorpay_client.payment.fetch.assert_not_called()
 
         # Verify order was updated
         self.order.refresh_from_db()
@@ -177,20 +144,18 @@ class PaymentsAPITestCase(TestCase):
         self.assertEqual(self.order.payment_id, "pay_test123")
         self.assertEqual(self.order.status, "processing")
 
-    @patch("razorpay.Client")
-    def test_invalid_payment_verification(self, mock_razorpay):
+        # Verifying the same payment again doesn't create a second record
+        response = self.client.post(url, self.verification_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_invalid_payment_verification(self):
         """Test invalid payment verification"""
         self.authenticate_user()
 
-        # Mock Razorpay client to raise an exception on verification
-        mock_client = MagicMock()
-        mock_razorpay.return_value = mock_client
-        mock_client.utility.verify_payment_signature.side_effect = Exception(
-            "Invalid signature"
-        )
-
         url = reverse("payment-verify-payment")
-        response = self.client.post(url, self.verification_data, format="json")
+        data = {**self.verification_data, "razorpay_signature": "invalid_signature"}
+        response = self.client.post(url, data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("detail", response.data)
@@ -198,8 +163,7 @@ class PaymentsAPITestCase(TestCase):
         # Verify no payment was created
         self.assertEqual(Payment.objects.count(), 0)
 
-    @patch("razorpay.Client")
-    def test_refund_payment(self, mock_razorpay):
+    def test_refund_payment(self):
         """Test refunding a payment"""
         self.authenticate_user()
 
@@ -221,9 +185,7 @@ class PaymentsAPITestCase(TestCase):
         self.order.save()
 
         # Mock Razorpay client for refund
-        mock_client = MagicMock()
-        mock_razorpay.return_value = mock_client
-        mock_client.payment.refund.return_value = {
+        self.razorpay_client.payment.refund.return_value = {
             "id": "rfnd_test123",
             "payment_id": "pay_test123",
             "amount": 11999,
@@ -237,9 +199,11 @@ class PaymentsAPITestCase(TestCase):
             "reason": "Customer request",
         }
 
-        response = self.client.post(url, refund_data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, refund_data, format="json")
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
 
         # Verify refund was created in database
         self.assertEqual(Refund.objects.count(), 1)
@@ -257,8 +221,7 @@ class PaymentsAPITestCase(TestCase):
         self.order.refresh_from_db()
         self.assertEqual(self.order.status, "cancelled")
 
-    @patch("razorpay.Client")
-    def test_partial_refund(self, mock_razorpay):
+    def test_partial_refund(self):
         """Test partial refund of a payment"""
         self.authenticate_user()
 
@@ -280,9 +243,7 @@ class PaymentsAPITestCase(TestCase):
         self.order.save()
 
         # Mock Razorpay client for refund
-        mock_client = MagicMock()
-        mock_razorpay.return_value = mock_client
-        mock_client.payment.refund.return_value = {
+        self.razorpay_client.payment.refund.return_value = {
             "id": "rfnd_test123",
             "payment_id": "pay_test123",
             "amount": 5000,  # 50.00 in paise
@@ -296,9 +257,11 @@ class PaymentsAPITestCase(TestCase):
             "reason": "Partial refund for damaged item",
         }
 
-        response = self.client.post(url, refund_data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, refund_data, format="json")
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
 
         # Verify refund was created
         self.assertEqual(Refund.objects.count(), 1)
@@ -313,6 +276,133 @@ class PaymentsAPITestCase(TestCase):
         self.order.refresh_from_db()
         self.assertEqual(self.order.status, "processing")
 
+    def test_failed_refund_is_rejected(self):
+        """Test that a refund Razorpay refuses is marked rejected"""
+        self.authenticate_user()
+        payment = Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+            razorpay_order_id="order_test123",
+        )
+
+        self.razorpay_client.payment.refund.side_effect = (
+            razorpay.errors.BadRequestError("Refund not allowed")
+        )
+
+        url = reverse("refund-request-refund")
+        refund_data = {"payment_id": "pay_test123", "amount": 50.00, "reason": "Test"}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, refund_data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Refund.objects.get().status, "rejected")
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "completed")
+
+    def test_unreachable_gateway_leaves_refund_pending(self):
+        """Test that a refund is retried, not rejected, on network errors"""
+        payment = Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+            razorpay_order_id="order_test123",
+        )
+        refund = Refund.objects.create(
+            payment=payment, refund_id="refund_test123", amount=50.00, reason="Test"
+        )
+
+        self.razorpay_client.payment.refund.side_effect = (
+            requests.exceptions.ConnectionError("Connection reset")
+        )
+
+        with patch.object(process_refund, "retry", side_effect=Retry()):
+            with self.assertRaises(Retry):
+                process_refund(refund.id)
+
+        refund.refresh_from_db()
+        self.assertEqual(refund.status, "pending")
+
+    def test_unexpected_gateway_response_rejects_refund(self):
+        """Test that an unexpected failure never leaves a refund processing"""
+        payment = Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+            razorpay_order_id="order_test123",
+        )
+        refund = Refund.objects.create(
+            payment=payment, refund_id="refund_test123", amount=50.00, reason="Test"
+        )
+
+        # A response without the refund id
+        self.razorpay_client.payment.refund.return_value = {"status": "processed"}
+
+        with self.assertLogs("apps.payments.tasks", level="ERROR"):
+            with self.assertRaises(KeyError):
+                process_refund(refund.id)
+
+        refund.refresh_from_db()
+        self.assertEqual(refund.status, "rejected")
+        self.assertEqual(refund.refund_id, "refund_test123")
+
+    def test_refund_is_submitted_once(self):
+        """Test that a refund already claimed is not submitted again"""
+        payment = Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+            razorpay_order_id="order_test123",
+        )
+        refund = Refund.objects.create(
+            payment=payment,
+            refund_id="refund_test123",
+            amount=50.00,
+            reason="Test",
+            status="processing",
+        )
+
+        process_refund(refund.id)
+
+        self.razorpay_client.payment.refund.assert_not_called()
+        refund.refresh_from_db()
+        self.assertEqual(refund.status, "processing")
+
+    def test_refund_with_invalid_amount(self):
+        """Test that invalid refund amounts are rejected before any refund"""
+        self.authenticate_user()
+        Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+            razorpay_order_id="order_test123",
+        )
+
+        url = reverse("refund-request-refund")
+        for amount in ["NaN", "Infinity", "-10.00", "0.001", "200.00", "abc"]:
+            with self.subTest(amount=amount):
+                refund_data = {
+                    "payment_id": "pay_test123",
+                    "amount": amount,
+                    "reason": "Test",
+                }
+                response = self.client.post(url, refund_data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("amount", response.data)
+
+        self.assertFalse(Refund.objects.exists())
+        self.razorpay_client.payment.refund.assert_not_called()
+
     def test_list_user_payments(self):
         """Test retrieving a user's payments"""
         self.authenticate_user()
@@ -326,6 +416,31 @@ class PaymentsAPITestCase(TestCase):
         else:
             self.assertIsInstance(response.data, list)
 
+    def test_list_payments_query_count(self):
+        """Test that listing payments doesn't query the order per payment"""
+        self.authenticate_user()
+        for payment_id in ("pay_test1", "pay_test2"):
+            order = Order.objects.create(
+                user=self.user,
+                subtotal=99.99,
+                shipping_cost=10.00,
+                tax=10.00,
+                total=119.99,
+            )
+            Payment.objects.create(
+                order=order,
+                payment_id=payment_id,
+                amount=119.99,
+                razorpay_order_id="order_test123",
+            )
+
+        # Count, then payments joined with their orders
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("payment-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
     def test_payment_detail(self):
         """Test retrieving payment details"""
         self.authenticate_user()
@@ -348,3 +463,40 @@ class PaymentsAPITestCase(TestCase):
         self.assertEqual(response.data["payment_id"], "pay_test123")
         self.assertEqual(response.data["status"], "completed")
         self.assertEqual(float(response.data["amount"]), 119.99)
+        self.assertEqual(
+            set(response.data["order_details"]),
+            {"id", "order_number", "total", "status"},
+        )
+        self.assertNotIn("razorpay_signature", response.data)
+
+    def test_create_refund_for_other_users_payment(self):
+        """Test that refunds can only be requested for the user's own payments"""
+        payment = Payment.objects.create(
+            order=self.order,
+            payment_id="pay_test123",
+            amount=119.99,
+            currency="INR",
+            status="completed",
+        )
+        other_user = User.objects.create_user(
+            email="other@example.com",
+            password="other12345",
+            first_name="Other",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=other_user)
+
+        url = reverse("refund-list")
+        data = {"payment": payment.id, "amount": "10.00", "reason": "Test"}
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("payment", response.data)
+        self.assertEqual(Refund.objects.count(), 0)
+
+    def test_api_schema_renders_anonymously(self):
+        """Test that the public API schema builds the scoped serializers"""
+        url = reverse("schema-swagger-ui") + "?format=openapi"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
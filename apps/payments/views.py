@@ -2,11 +2,12 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.conf import settings
-import razorpay
+from django.db import transaction
 import uuid
 import hmac
 import hashlib
 
+from .gateway import get_razorpay_client
 from .models import Payment, Refund
 from .serializers import (
     PaymentSerializer,
@@ -15,8 +16,12 @@ from .serializers import (
     RefundSerializer,
     RefundCreateSerializer,
 )
+from .tasks import process_refund
 from apps.orders.models import Order
 
+# Every Razorpay order is created in this currency
+RAZORPAY_CURRENCY = "INR"
+
 
 class PaymentViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
@@ -24,9 +29,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Payment.objects.select_related("order")
         if user.is_staff:
-            return Payment.objects.all()
-        return Payment.objects.filter(order__user=user)
+            return queryset
+        return queryset.filter(order__user=user)
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -45,16 +51,13 @@ class PaymentViewSet(viewsets.ModelViewSet):
             )
 
         # Check if order already has a payment
-        if hasattr(order, "payment"):
+        if Payment.objects.filter(order_id=order.id).exists():
             return Response(
                 {"detail": "Payment for this order already exists"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Initialize Razorpay client
-        client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-        )
+        client = get_razorpay_client()
 
         # Convert decimal to integer (paise)
         amount_in_paise = int(order.total * 100)
@@ -63,7 +66,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         razorpay_order = client.order.create(
             {
                 "amount": amount_in_paise,
-                "currency": "INR",
+                "currency": RAZORPAY_CURRENCY,
                 "receipt": order.order_number,
                 "payment_capture": 1,  # Auto capture payment
                 "notes": {"order_id": str(order.id), "user_email": request.user.email},
@@ -76,7 +79,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 "order_id": order.id,
                 "razorpay_order_id": razorpay_order["id"],
                 "amount": amount_in_paise,
-                "currency": "INR",
+                "currency": RAZORPAY_CURRENCY,
                 "key": settings.RAZORPAY_KEY_ID,
                 "name": "E-commerce Store",
                 "description": f"Payment for Order #{order.order_number}",
@@ -100,57 +103,69 @@ class PaymentViewSet(viewsets.ModelViewSet):
         razorpay_order_id = serializer.validated_data["razorpay_order_id"]
         razorpay_signature = serializer.validated_data["razorpay_signature"]
 
-        # Initialize Razorpay client
-        client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-        )
-
-        # Verify signature
-        params_dict = {
-            "razorpay_payment_id": razorpay_payment_id,
-            "razorpay_order_id": razorpay_order_id,
-            "razorpay_signature": razorpay_signature,
-        }
-
-        try:
-            client.utility.verify_payment_signature(params_dict)
-        except Exception as e:
+        # Verify signature: HMAC-SHA256 of "order_id|payment_id" keyed with
+        # the API secret, the same check the Razorpay SDK performs
+        message = f"{razorpay_order_id}|{razorpay_payment_id}".encode()
+        expected_signature = hmac.new(
+            settings.RAZORPAY_KEY_SECRET.encode(), message, hashlib.sha256
+        ).hexdigest()
+        if not hmac.compare_digest(
+            expected_signature.encode(), razorpay_signature.encode()
+        ):
             return Response(
-                {"detail": "Invalid payment signature", "error": str(e)},
+                {"detail": "Invalid payment signature"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get the Razorpay order
-        razorpay_order = client.order.fetch(razorpay_order_id)
-
-        # Get the payment
-        razorpay_payment = client.payment.fetch(razorpay_payment_id)
+        # Get the Razorpay order. The signature only proves the Razorpay
+        # order and payment belong together; the order_id note set in
+        # create_razorpay_order ties them to our order. The payment itself
+        # isn't fetched, since its currency is always the order's.
+        razorpay_order = get_razorpay_client().order.fetch(razorpay_order_id)
 
-        # Get order from the notes
         try:
             order_id = razorpay_order["notes"]["order_id"]
-            order = Order.objects.get(id=order_id, user=request.user)
-        except (KeyError, Order.DoesNotExist):
+        except KeyError:
             return Response(
                 {"detail": "Order not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Create payment record
-        payment = Payment.objects.create(
-            order=order,
-            payment_id=razorpay_payment_id,
-            amount=order.total,
-            currency=razorpay_payment["currency"],
-            status="completed",
-            razorpay_order_id=razorpay_order_id,
-            razorpay_signature=razorpay_signature,
-        )
+        with transaction.atomic():
+            # Lock the order so a concurrent verification of the same payment
+            # waits here and then sees the payment row created below
+            try:
+                order = Order.objects.select_for_update().get(
+                    id=order_id, user=request.user
+                )
+            except Order.DoesNotExist:
+                return Response(
+                    {"detail": "Order not found"}, status=status.HTTP_404_NOT_FOUND
+                )
+
+            if Payment.objects.filter(order_id=order.id).exists():
+                return Response(
+                    {"detail": "Payment for this order already exists"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Create payment record
+            payment = Payment.objects.create(
+                order=order,
+                payment_id=razorpay_payment_id,
+                amount=order.total,
+                currency=RAZORPAY_CURRENCY,
+                status="completed",
+                razorpay_order_id=razorpay_order_id,
+                razorpay_signature=razorpay_signature,
+            )
 
-        # Update order payment status
-        order.payment_status = "paid"
-        order.payment_id = razorpay_payment_id
-        order.status = "processing"
-        order.save()
+            # Update order payment status
+            order.payment_status = "paid"
+            order.payment_id = razorpay_payment_id
+            order.status = "processing"
+            order.save(
+                update_fields=["payment_status", "payment_id", "status", "updated_at"]
+            )
 
         # Return payment details
         return Response(PaymentSerializer(payment).data)
@@ -162,9 +177,10 @@ class RefundViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Refund.objects.select_related("payment")
         if user.is_staff:
-            return Refund.objects.all()
-        return Refund.objects.filter(payment__order__user=user)
+            return queryset
+        return queryset.filter(payment__order__user=user)
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -197,43 +213,20 @@ class RefundViewSet(viewsets.ModelViewSet):
                 {"detail": "Payment not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Initialize Razorpay client
-        client = razorpay.Client(
-            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+        # Validate the amount against the payment the same way refund
+        # creation does, before any refund row is written
+        serializer = RefundCreateSerializer(
+            data={"payment": payment.id, "amount": amount, "reason": reason},
+            context={"request": request},
         )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            # Initiate refund
-            refund = client.payment.refund(
-                payment_id,
-                {
-                    "amount": int(float(amount) * 100),  # Convert to paise
-                    "notes": {"reason": reason, "order_id": str(payment.order.id)},
-                },
-            )
-
-            # Create refund record
-            refund_obj = Refund.objects.create(
-                payment=payment,
-                refund_id=refund["id"],
-                amount=amount,
-                reason=reason,
-                status="processed",
-            )
-
-            # Update payment status if fully refunded
-            if float(amount) >= float(payment.amount):
-                payment.status = "refunded"
-                payment.save()
-
-                # Update order status
-                payment.order.status = "cancelled"
-                payment.order.save()
-
-            return Response(RefundSerializer(refund_obj).data)
+        # Record the refund as pending and submit it to Razorpay in the
+        # background; the refund's status reflects the outcome
+        refund = serializer.save(
+            refund_id=f"refund_{uuid.uuid4().hex[:10]}", status="pending"
+        )
+        transaction.on_commit(lambda: process_refund.delay(refund.id))
 
-        except Exception as e:
-            return Response(
-                {"detail": "Refund failed", "error": str(e)},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        return Response(RefundSerializer(refund).data, status=status.HTTP_202_ACCEPTED)
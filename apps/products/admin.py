@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import Category, Product, ProductImage, Review
 
 
@@ -7,16 +9,6 @@ class ProductImageInline(admin.TabularInline):
     extra = 1
 
 
-class ReviewInline(admin.TabularInline):
-    model = Review
-    extra = 0
-    readonly_fields = ("user", "rating", "comment", "created_at")
-    can_delete = False
-
-    def has_add_permission(self, request, obj):
-        return False
-
-
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "is_active", "created_at")
     list_filter = ("is_active",)
@@ -35,22 +27,41 @@ class ProductAdmin(admin.ModelAdmin):
         "is_active",
         "created_at",
     )
+    list_select_related = ("category",)
+    list_per_page = 50
+    # Skip the unfiltered COUNT(*) shown next to filtered result counts
+    show_full_result_count = False
     list_filter = ("is_active", "category", "created_at")
     search_fields = ("name", "description")
     prepopulated_fields = {"slug": ("name",)}
-    inlines = [ProductImageInline, ReviewInline]
-    readonly_fields = ("created_at", "updated_at")
+    inlines = [ProductImageInline]
+    readonly_fields = ("created_at", "updated_at", "reviews_link")
     list_editable = ("stock", "is_active")
 
+    @admin.display(description="Reviews")
+    def reviews_link(self, obj):
+        # Reviews are listed on their own paginated changelist rather than
+        # inline, so a popular product's form doesn't load all of them
+        if obj.pk is None:
+            return "-"
+        url = reverse("admin:products_review_changelist")
+        return format_html(
+            '<a href="{}?product__id__exact={}">View reviews</a>', url, obj.pk
+        )
+
 
 class ProductImageAdmin(admin.ModelAdmin):
     list_display = ("product", "is_primary", "created_at")
+    list_select_related = ("product",)
     list_filter = ("is_primary", "created_at")
     search_fields = ("product__name",)
 
 
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ("product", "user", "rating", "created_at")
+    list_select_related = ("product", "user")
+    list_per_page = 50
+    show_full_result_count = False
     list_filter = ("rating", "created_at")
     search_fields = ("product__name", "user__email", "comment")
     readonly_fields = ("created_at",)
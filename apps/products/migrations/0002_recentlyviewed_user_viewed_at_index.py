@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='recentlyviewed',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='products_recentlyviewed_user_product_uniq'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recentlyviewed',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='recentlyviewed',
+            index=models.Index(fields=['user', '-viewed_at'], name='products_re_user_id_a29a65_idx'),
+        ),
+    ]
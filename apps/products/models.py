@@ -119,3 +119,7 @@ class Review(models.Model):
 
     def __str__(self):
         return f"Review by {self.user.email} for {self.product.name}"
+
+
+# Models kept in their own modules still need to be registered with the app
+from .recently_viewed_models import RecentlyViewed  # noqa: E402,F401
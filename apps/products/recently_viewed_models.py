@@ -13,7 +13,13 @@ class RecentlyViewed(models.Model):
     viewed_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ["user", "product"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "product"],
+                name="products_recentlyviewed_user_product_uniq",
+            )
+        ]
+        indexes = [models.Index(fields=["user", "-viewed_at"])]
         ordering = ["-viewed_at"]
         verbose_name = "Recently Viewed Product"
         verbose_name_plural = "Recently Viewed Products"
@@ -28,18 +34,21 @@ class RecentlyViewed(models.Model):
         Keep only the most recent max_items for each user.
         """
         if not user.is_authenticated:
-            return None
-
-        # Update or create the viewed product record
-        viewed_item, created = cls.objects.update_or_create(
-            user=user, product=product, defaults={"viewed_at": models.functions.Now()}
+            return
+
+        # Insert the view, or refresh viewed_at if the product was already
+        # in the list, in a single upsert
+        cls.objects.bulk_create(
+            [cls(user=user, product=product)],
+            update_conflicts=True,
+            unique_fields=["user", "product"],
+            update_fields=["viewed_at"],
         )
 
-        # Limit the number of recently viewed items
-        if created and cls.objects.filter(user=user).count() > max_items:
-            # Delete the oldest viewed item
-            oldest = cls.objects.filter(user=user).order_by("viewed_at").first()
-            if oldest:
-                oldest.delete()
-
-        return viewed_item
+        # Drop everything past the newest max_items in one DELETE
+        cls.objects.filter(
+            user=user,
+            id__in=cls.objects.filter(user=user)
+            .order_by("-viewed_at")
+            .values("id")[max_items:],
+        ).delete()
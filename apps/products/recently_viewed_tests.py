@@ -48,15 +48,9 @@ class RecentlyViewedAPITestCase(TestCase):
 
     def authenticate_user(self, user="default"):
         """Helper method to authenticate users"""
-        if user == "another":
-            credentials = {"email": "another@example.com", "password": "another12345"}
-        else:
-            credentials = {"email": "user@example.com", "password": "user12345"}
-
-        response = self.client.post(
-            reverse("token_obtain_pair"), credentials, format="json"
+        self.client.force_authenticate(
+            user=self.another_user if user == "another" else self.user
         )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
 
     def test_recently_viewed_tracking(self):
         """Test that viewing products adds them to recently viewed"""
@@ -15,7 +15,12 @@ class RecentlyViewedViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return RecentlyViewed.objects.filter(user=self.request.user)
+        # Load everything the nested ProductSerializer reads up front
+        return (
+            RecentlyViewed.objects.filter(user=self.request.user)
+            .select_related("product__category")
+            .prefetch_related("product__images", "product__reviews")
+        )
 
     @action(detail=False, methods=["get"])
     def list_products(self, request):
@@ -23,7 +28,7 @@ class RecentlyViewedViewSet(viewsets.ReadOnlyModelViewSet):
         user_id = request.user.id
         cached_data = cached_recently_viewed(user_id)
 
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
 
         # If not in cache, get from database
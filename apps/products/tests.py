@@ -1,10 +1,11 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from rest_framework import status
 from .models import Category, Product, ProductImage, Review
 from apps.accounts.models import User
+from apps.core.cache import get_cache_key
 import tempfile
 import os
 
@@ -70,25 +71,11 @@ class ProductsAPITestCase(TestCase):
 
     def authenticate_admin(self):
         """Helper method to authenticate as admin"""
-        response = self.client.post(
-            reverse("token_obtain_pair"),
-            {"email": "admin@example.com", "password": "admin12345"},
-            format="json",
-        )
-
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.client.force_authenticate(user=self.admin)
 
     def authenticate_user(self, admin=False):
         """Helper method to authenticate user or admin"""
-        if admin:
-            credentials = {"email": "admin@example.com", "password": "admin12345"}
-        else:
-            credentials = {"email": "user@example.com", "password": "user12345"}
-
-        response = self.client.post(
-            reverse("token_obtain_pair"), credentials, format="json"
-        )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.client.force_authenticate(user=self.admin if admin else self.user)
 
     def test_category_list(self):
         """Test retrieving category list"""
@@ -122,7 +109,7 @@ class ProductsAPITestCase(TestCase):
         self.assertEqual(Category.objects.count(), 2)
 
         # Test that regular users cannot create categories
-        self.client.credentials()  # Clear credentials
+        self.client.force_authenticate(user=None)  # Clear credentials
         self.authenticate_user()
 
         response = self.client.post(url, data, format="json")
@@ -171,7 +158,7 @@ class ProductsAPITestCase(TestCase):
         )
 
         # Test that regular users cannot create products
-        self.client.credentials()  # Clear credentials
+        self.client.force_authenticate(user=None)  # Clear credentials
         self.authenticate_user()
 
         response = self.client.post(url, self.product_data, format="json")
@@ -193,6 +180,32 @@ class ProductsAPITestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_update_product_invalidates_list_cache(self):
+        """Test that updating a product refreshes cached lists containing it"""
+        list_url = reverse("product-list")
+        response = self.client.get(list_url)
+        self.assertEqual(response.data["results"][0]["name"], "Existing Product")
+
+        self.authenticate_admin()
+        url = reverse("product-detail", kwargs={"slug": self.product.slug})
+        self.client.patch(url, {"name": "Renamed Product"}, format="json")
+
+        response = self.client.get(list_url)
+        self.assertEqual(response.data["results"][0]["name"], "Renamed Product")
+
+    def test_update_product_invalidates_lists_it_newly_matches(self):
+        """Test that updating a product refreshes cached lists it did not match"""
+        search_url = reverse("product-list") + "?search=Renamed"
+        response = self.client.get(search_url)
+        self.assertEqual(response.data["count"], 0)
+
+        self.authenticate_admin()
+        url = reverse("product-detail", kwargs={"slug": self.product.slug})
+        self.client.patch(url, {"name": "Renamed Product"}, format="json")
+
+        response = self.client.get(search_url)
+        self.assertEqual(response.data["count"], 1)
+
     def test_delete_product(self):
         """Test deleting a product (admin only)"""
         self.authenticate_admin()
@@ -278,3 +291,19 @@ class ProductsAPITestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
+
+
+class CacheKeyTestCase(SimpleTestCase):
+    def test_cache_key_distinguishes_param_types(self):
+        """Test that params differing only in value type get different keys"""
+        self.assertNotEqual(
+            get_cache_key("product_list", "all", {"page": 1}),
+            get_cache_key("product_list", "all", {"page": "1"}),
+        )
+
+    def test_cache_key_ignores_separator_injection(self):
+        """Test that separators inside values cannot forge another key"""
+        self.assertNotEqual(
+            get_cache_key("product_list", "all", {"a": "1;b=2"}),
+            get_cache_key("product_list", "all", {"a": "1", "b": "2"}),
+        )
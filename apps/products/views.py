@@ -58,7 +58,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         filters = request.query_params.dict()
         cached_products = cached_category_products(instance.id, filters)
 
-        if cached_products:
+        if cached_products is not None:
             return Response({"category": serializer.data, "products": cached_products})
 
         # If not cached, get from database
@@ -105,7 +105,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         filters = request.query_params.dict()
         cached_data = cached_product_list(filters)
 
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
 
         # If not cached, get from database
@@ -130,7 +130,7 @@ class ProductViewSet(viewsets.ModelViewSet):
 
         # Check cache
         cached_data = cached_product_detail(instance.id)
-        if cached_data:
+        if cached_data is not None:
             # Even with cached data, record the view
             if request.user.is_authenticated:
                 RecentlyViewed.add_product_view(request.user, instance)
@@ -222,15 +222,15 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Check cache first
         if product_id:
             cached_data = cached_recommendations("product", product_id, limit)
-            if cached_data:
+            if cached_data is not None:
                 return Response(cached_data)
         elif user.is_authenticated:
             cached_data = cached_recommendations("user", user.id, limit)
-            if cached_data:
+            if cached_data is not None:
                 return Response(cached_data)
         else:
             cached_data = cached_recommendations("popular", "all", limit)
-            if cached_data:
+            if cached_data is not None:
                 return Response(cached_data)
 
         # If not in cache, generate recommendations
@@ -347,7 +347,7 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     def set_primary(self, request, pk=None):
         image = self.get_object()
         image.is_primary = True
-        image.save()
+        image.save(update_fields=["is_primary"])
         # Invalidate product cache
         invalidate_product_cache(image.product.id)
         return Response({"detail": "Image set as primary"})
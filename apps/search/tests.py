@@ -79,12 +79,7 @@ class SearchAPITestCase(TestCase):
 
     def authenticate_user(self):
         """Helper method to authenticate user"""
-        response = self.client.post(
-            reverse("token_obtain_pair"),
-            {"email": "user@example.com", "password": "user12345"},
-            format="json",
-        )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.client.force_authenticate(user=self.user)
 
     def test_search_products(self):
         """Test searching for products"""
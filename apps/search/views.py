@@ -64,7 +64,7 @@ class SearchAPIView(APIView):
         if query_text:
             cached_results = cached_search_results(query_text, cache_filters)
 
-        if cached_results:
+        if cached_results is not None:
             return Response(cached_results)
 
         # If not in cache, perform the search
@@ -185,7 +185,7 @@ class RecommendationAPIView(APIView):
         # Check cache first
         if product_id:
             cached_data = cached_recommendations("product", product_id, limit)
-            if cached_data:
+            if cached_data is not None:
                 # Record impressions even for cached results
                 self._record_recommendation_events(
                     request, cached_data, "similar_products"
@@ -193,7 +193,7 @@ class RecommendationAPIView(APIView):
                 return Response(cached_data)
         elif category_id:
             cached_data = cached_recommendations("category", category_id, limit)
-            if cached_data:
+            if cached_data is not None:
                 self._record_recommendation_events(
                     request, cached_data, "category_recommendations"
                 )
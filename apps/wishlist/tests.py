@@ -6,6 +6,7 @@ from .models import Wishlist, WishlistItem
 from apps.accounts.models import User
 from apps.products.models import Category, Product
 from apps.cart.models import Cart, CartItem
+from apps.core.cache import cached_user_cart, cached_user_wishlist
 import json
 
 
@@ -58,15 +59,9 @@ class WishlistAPITestCase(TestCase):
 
     def authenticate_user(self, user="default"):
         """Helper method to authenticate users"""
-        if user == "another":
-            credentials = {"email": "another@example.com", "password": "another12345"}
-        else:
-            credentials = {"email": "user@example.com", "password": "user12345"}
-
-        response = self.client.post(
-            reverse("token_obtain_pair"), credentials, format="json"
+        self.client.force_authenticate(
+            user=self.another_user if user == "another" else self.user
         )
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
 
     def test_get_empty_wishlist(self):
         """Test retrieving an empty wishlist"""
@@ -216,6 +211,25 @@ class WishlistAPITestCase(TestCase):
             cart_response.data["items"][0]["product"]["id"], self.product1.id
         )
 
+    def test_move_to_cart_invalidates_cached_bundle(self):
+        """Test that moving an item drops both the cached wishlist and cart"""
+        self.authenticate_user()
+        self.client.post(
+            reverse("wishlist-add-item"), self.wishlist_item_data, format="json"
+        )
+
+        # Prime the caches
+        self.client.get(reverse("wishlist-my-wishlist"))
+        self.client.get(reverse("cart-my-cart"))
+        self.assertIsNotNone(cached_user_wishlist(self.user.id))
+        self.assertIsNotNone(cached_user_cart(self.user.id))
+
+        url = reverse("wishlist-move-to-cart")
+        self.client.post(url, self.wishlist_item_data, format="json")
+
+        self.assertIsNone(cached_user_wishlist(self.user.id))
+        self.assertIsNone(cached_user_cart(self.user.id))
+
     def test_move_nonexistent_wishlist_item(self):
         """Test moving an item that is not in the wishlist"""
         self.authenticate_user()
@@ -12,7 +12,7 @@ from apps.core.cache import (
     cached_user_wishlist,
     cache_user_wishlist,
     invalidate_user_wishlist,
-    invalidate_user_cart,
+    invalidate_user_bundle,
 )
 
 
@@ -33,7 +33,7 @@ class WishlistViewSet(viewsets.GenericViewSet):
         user_id = request.user.id
         cached_data = cached_user_wishlist(user_id)
 
-        if cached_data:
+        if cached_data is not None:
             return Response(cached_data)
 
         # If not in cache, get from database
@@ -115,14 +115,13 @@ class WishlistViewSet(viewsets.GenericViewSet):
 
         if not created:
             cart_item.quantity += 1
-            cart_item.save()
+            cart_item.save(update_fields=["quantity", "updated_at"])
 
         # Remove from wishlist
         wishlist_item.delete()
 
         # Invalidate caches
-        invalidate_user_wishlist(request.user.id)
-        invalidate_user_cart(request.user.id)
+        invalidate_user_bundle(request.user.id, ["wishlist", "cart"])
 
         wishlist_serializer = self.get_serializer(wishlist)
         return Response(
@@ -141,7 +141,7 @@ SWAGGER_SETTINGS = {
 # Update DRF settings for proper JWT authentication
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.auth.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -216,6 +216,11 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Order follow-ups get their own queue so long-running jobs can't delay them
+CELERY_TASK_ROUTES = {
+    "apps.orders.tasks.*": {"queue": "orders"},
+}
+
 # Scheduled tasks
 CELERY_BEAT_SCHEDULE = {
     "update_product_similarities": {
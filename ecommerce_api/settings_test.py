@@ -0,0 +1,39 @@
+"""
+Settings used by run_tests.py.
+Tests run against an in-memory SQLite database unless TEST_DATABASE_URL is
+set, and passwords are hashed with MD5 since hashing strength doesn't matter
+for test users. The test database is built straight from the models rather
+than by replaying migrations; set TEST_MIGRATE=1 to run the migrations too.
+Cache keys include the process id so parallel test workers sharing one Redis
+never see each other's entries.
+"""
+import os
+
+import dj_database_url
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    "default": dj_database_url.config(
+        env="TEST_DATABASE_URL", default="sqlite://:memory:"
+    )
+}
+DATABASES["default"]["TEST"] = {"MIGRATE": os.environ.get("TEST_MIGRATE") == "1"}
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Run Celery tasks inline instead of sending them to a broker
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
+
+def worker_cache_key(key, key_prefix, version):
+    return f"{key_prefix}:{os.getpid()}:{version}:{key}"
+
+
+CACHES = {
+    **CACHES,  # noqa: F405
+    "default": {**CACHES["default"], "KEY_FUNCTION": worker_cache_key},  # noqa: F405
+}
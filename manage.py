@@ -6,7 +6,11 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce_api.settings")
+    if sys.argv[1:2] == ["test"]:
+        # Use the test settings (SQLite, fast password hasher) for test runs
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce_api.settings_test")
+    else:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce_api.settings")
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -1,25 +1,34 @@
 #!/usr/bin/env python
 """
 A script to run tests for all apps in the e-commerce API.
-Usage: python run_tests.py [app_name]
+Usage: python run_tests.py [app_name] [--keepdb] [--parallel]
 If app_name is provided, only tests for that app will be run.
 Otherwise, tests for all apps will be run.
+--keepdb reuses the test database between runs when TEST_DATABASE_URL points
+at a persistent database (the default in-memory SQLite is always fresh).
+--parallel splits the test classes across one process per CPU core.
 """
 import os
 import sys
 import django
 from django.conf import settings
+from django.test.runner import get_max_test_processes
 from django.test.utils import get_runner
 
 # Set up Django environment
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce_api.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecommerce_api.settings_test")
 django.setup()
 
 
-def run_tests(app_names=None):
+def run_tests(app_names=None, keepdb=False, parallel=False):
     """Run the tests for the specified apps"""
     TestRunner = get_runner(settings)
-    test_runner = TestRunner(verbosity=2, interactive=True)
+    test_runner = TestRunner(
+        verbosity=2,
+        interactive=True,
+        keepdb=keepdb,
+        parallel=get_max_test_processes() if parallel else 0,
+    )
 
     if app_names:
         if not isinstance(app_names, list):
@@ -45,12 +54,20 @@ def run_tests(app_names=None):
 
 
 if __name__ == "__main__":
+    args = sys.argv[1:]
+    keepdb = "--keepdb" in args
+    if keepdb:
+        args.remove("--keepdb")
+    parallel = "--parallel" in args
+    if parallel:
+        args.remove("--parallel")
+
     # Check if an app name was provided
-    if len(sys.argv) > 1:
-        app_name = sys.argv[1]
-        failures = run_tests(app_name)
+    if args:
+        app_name = args[0]
+        failures = run_tests(app_name, keepdb=keepdb, parallel=parallel)
     else:
-        failures = run_tests()
+        failures = run_tests(keepdb=keepdb, parallel=parallel)
 
     # Exit with number of failures as exit code
     sys.exit(bool(failures))